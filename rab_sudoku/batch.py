@@ -0,0 +1,184 @@
+"""
+Batch solving Classes
+"""
+import os
+
+from rab_sudoku import csv_io, line_io, solver
+
+# Buffer size for the results file
+OUTPUT_BUFFER_SIZE = 1 << 20
+
+class BatchSolver:
+    """
+    Solve a batch of problem files
+
+    The solutions are written to a single results file in one line per
+    puzzle format. Line n of the results holds the solution for input
+    n, or is empty if that input could not be read or solved.
+
+    Results are collected in memory and written in one block every
+    checkpointInterval inputs. The block is flushed and synced to disk
+    before the checkpoint is written, so the checkpoint never counts a
+    result that is not on disk. The checkpoint holds the number of
+    inputs processed and the length of the results file at that point.
+    """
+
+    def __init__(self, checkpointInterval=100, budget=None):
+        """
+        - checkpointInterval - int number of inputs between checkpoints
+        - budget - function returning a new SearchBudget for each
+          problem, or None for unlimited searches
+        """
+        self.__checkpointInterval = int(checkpointInterval)
+        if self.__checkpointInterval < 1:
+            raise ValueError("Checkpoint interval must be at least 1")
+        self.__budget = budget
+        self.__reader = csv_io.CsvModelReader()
+        self.__solvers = {}
+        self.__writers = {}
+
+
+
+
+    def run(self, paths, output, checkpoint=None, resume=False):
+        """
+        Solve the problems in a sequence of files
+
+        - paths - sequence of input file paths, in a stable order
+        - output - path of the results file
+        - checkpoint - path of the checkpoint file or None
+        - resume - if True skip the inputs recorded in checkpoint and
+          append to the results recorded there
+        Returns
+        - unsolved - list of the input paths whose problems had no
+          solution or ran out of budget
+        - failed - list of (path, exception) for inputs that could not
+          be read
+        Raises FileNotFoundError if resuming from a checkpoint whose
+        results file is missing.
+        """
+        start = 0
+        offset = 0
+        if resume and checkpoint != None:
+            start, offset = self.readCheckpoint(checkpoint)
+
+        if start > 0:
+            # Line n of the results must stay with input n, so resuming
+            # needs the results recorded in the checkpoint
+            if not os.path.exists(output):
+                raise FileNotFoundError("Results file {0:s} for checkpoint "
+                                        "{1:s} is missing".format(output,
+                                                                  checkpoint))
+            # Drop any results written after the last checkpoint
+            fobj = open(output, 'r+b', buffering=OUTPUT_BUFFER_SIZE)
+            fobj.truncate(offset)
+            fobj.seek(offset)
+        else:
+            fobj = open(output, 'wb', buffering=OUTPUT_BUFFER_SIZE)
+
+        unsolved = []
+        failed = []
+        lines = []
+        processed = start
+        try:
+            for path in paths[start:]:
+                try:
+                    line = self._solveFile(path)
+                except csv_io.READ_ERRORS as e:
+                    failed.append((path, e))
+                    line = b''
+                else:
+                    if line == None:
+                        unsolved.append(path)
+                        line = b''
+                lines.append(line + b'\n')
+                processed += 1
+
+                if len(lines) >= self.__checkpointInterval:
+                    self._commit(fobj, lines, checkpoint, processed)
+                    lines = []
+
+            self._commit(fobj, lines, checkpoint, processed)
+        finally:
+            fobj.close()
+
+        return unsolved, failed
+
+
+
+
+    def readCheckpoint(self, checkpoint):
+        """
+        Read a checkpoint
+
+        A missing checkpoint file means nothing has been processed.
+        Returns
+        - int number of inputs processed
+        - int length of the results file in bytes
+        """
+        try:
+            with open(checkpoint, 'r') as fd:
+                processed, offset = fd.read().split()
+                return int(processed), int(offset)
+        except FileNotFoundError:
+            return 0, 0
+
+
+
+
+    def writeCheckpoint(self, checkpoint, processed, offset):
+        """
+        Record the number of inputs processed and the results length
+
+        The file is replaced atomically so that a crash while writing
+        leaves the previous checkpoint intact.
+        """
+        tmp = checkpoint + ".tmp"
+        with open(tmp, 'w') as fd:
+            fd.write("{0:d} {1:d}\n".format(processed, offset))
+            fd.flush()
+            os.fsync(fd.fileno())
+        os.replace(tmp, checkpoint)
+
+
+
+
+    def _commit(self, fobj, lines, checkpoint, processed):
+        """
+        Write a block of result lines, sync it and record a checkpoint
+        """
+        fobj.write(b''.join(lines))
+        fobj.flush()
+        os.fsync(fobj.fileno())
+        if checkpoint != None:
+            self.writeCheckpoint(checkpoint, processed, fobj.tell())
+
+
+
+
+    def _solveFile(self, path):
+        """
+        Solve the problem in path
+
+        Returns
+        - bytes of the solution in one line per puzzle format, without
+          the line ending, or None if the problem was not solved
+        """
+        with csv_io.openModelFile(path) as fd:
+            model = self.__reader.read(fd)
+        if model == None:
+            raise SyntaxError("No model found in {0:s}".format(path))
+
+        board = model.getBoard()
+        if board not in self.__solvers:
+            self.__solvers[board] = solver.BitBoardSolver(board)
+            self.__writers[board] = line_io.LineModelWriter(board)
+
+        budget = None if self.__budget == None else self.__budget()
+        try:
+            result = self.__solvers[board].solve(model.getProblem(), budget)
+        except solver.BudgetExceeded:
+            return None
+        if result == None:
+            return None
+        return self.__writers[board].encode(result)
@@ -0,0 +1,278 @@
+"""
+Puzzle catalogue Classes
+
+Problems are stored in an sqlite database together with metadata that
+can be queried without reading or solving the problems again.
+"""
+import hashlib
+import sqlite3
+
+from rab_sudoku import game_model, data_model, csv_io, solver
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS puzzles (
+    id INTEGER PRIMARY KEY,
+    x_size INTEGER NOT NULL,
+    y_size INTEGER NOT NULL,
+    clues INTEGER NOT NULL,
+    hash TEXT NOT NULL UNIQUE,
+    cells BLOB NOT NULL,
+    solutions INTEGER,
+    nodes INTEGER
+);
+CREATE INDEX IF NOT EXISTS puzzles_board_clues
+    ON puzzles (x_size, y_size, clues);
+CREATE INDEX IF NOT EXISTS puzzles_board_nodes
+    ON puzzles (x_size, y_size, nodes);
+"""
+
+# Search nodes allowed when grading each problem by default
+DEFAULT_MAX_NODES = 100000
+
+
+
+
+def canonicalHash(problem):
+    """
+    Return a hash of problem that ignores the choice of symbols
+
+    The values are renumbered in order of first appearance, so problems
+    that differ only by swapping digits have the same hash. Rotations,
+    reflections and row or column swaps are not taken into account.
+    """
+    board = problem.getBoard()
+    relabel = {0: 0}
+    cells = []
+    for value in problem.getCells():
+        if value not in relabel:
+            relabel[value] = len(relabel)
+        cells.append(relabel[value])
+
+    digest = hashlib.sha1()
+    digest.update("{0:d},{1:d}:".format(board.getXSize(),
+                                        board.getYSize()).encode('ascii'))
+    digest.update(bytes(cells))
+    return digest.hexdigest()
+
+
+
+
+class Catalogue:
+    """
+    An indexed catalogue of problems
+
+    Each problem is stored with its board dimensions, clue count,
+    canonical hash and solve statistics. The number of solutions is
+    counted up to 2, so 1 means the problem is unique. The number of
+    search nodes needed to count them is kept as a measure of
+    difficulty. Both are NULL (unknown) for problems that ran out of
+    search budget.
+    """
+
+    def __init__(self, path, budget=None):
+        """
+        - path - path of the sqlite database, created if needed
+        - budget - function returning a new SearchBudget for each
+          problem. Defaults to DEFAULT_MAX_NODES search nodes.
+        """
+        self.__connection = sqlite3.connect(path)
+        self.__connection.executescript(SCHEMA)
+        if budget == None:
+            budget = lambda: solver.SearchBudget(maxNodes=DEFAULT_MAX_NODES)
+        self.__budget = budget
+        self.__solvers = {}
+
+
+
+
+    def close(self):
+        self.__connection.close()
+
+
+
+
+    def addModels(self, models):
+        """
+        Add the problems from a sequence of GameModels
+
+        All of the problems are inserted in a single transaction.
+        Problems with the same canonical hash as one already in the
+        catalogue are skipped.
+        Returns
+        - int number of problems added
+        - list of (index, exception) for models that could not be
+          added, such as variant boards
+        """
+        failed = []
+        return self._insert(enumerate(models), failed), failed
+
+
+
+
+    def addFiles(self, paths):
+        """
+        Add the problems from a sequence of CSV model files
+
+        Returns
+        - int number of problems added
+        - list of (path, exception) for files that could not be read
+          or added
+        """
+        reader = csv_io.CsvModelReader()
+        failed = []
+
+        def readModels():
+            for path in paths:
+                try:
+                    with csv_io.openModelFile(path) as fd:
+                        model = reader.read(fd)
+                    if model == None:
+                        raise SyntaxError("No model found in "
+                                          "{0:s}".format(path))
+                except csv_io.READ_ERRORS as e:
+                    failed.append((path, e))
+                else:
+                    yield path, model
+
+        return self._insert(readModels(), failed), failed
+
+
+
+
+    def count(self, board=None, minClues=None, maxClues=None, unique=None,
+              minNodes=None, maxNodes=None):
+        """
+        Return the number of problems matching the filters
+
+        The filters are the same as for query().
+        """
+        where, params = self._where({'board': board,
+                                     'minClues': minClues,
+                                     'maxClues': maxClues,
+                                     'unique': unique,
+                                     'minNodes': minNodes,
+                                     'maxNodes': maxNodes})
+        cursor = self.__connection.execute(
+                "SELECT COUNT(*) FROM puzzles" + where, params)
+        return cursor.fetchone()[0]
+
+
+
+
+    def query(self, board=None, minClues=None, maxClues=None, unique=None,
+              minNodes=None, maxNodes=None, limit=None):
+        """
+        Generate GameModels for the problems matching the filters
+
+        Models are created as the results are read from the database.
+        The order of the results is not defined.
+        - board - BoardType or None for any board
+        - minClues, maxClues - int inclusive range of given cells
+        - unique - True for problems with exactly one solution, False
+          for problems with more or none. Problems that ran out of
+          search budget match neither.
+        - minNodes, maxNodes - int inclusive range of search nodes
+        - limit - int maximum number of problems
+        """
+        where, params = self._where({'board': board,
+                                     'minClues': minClues,
+                                     'maxClues': maxClues,
+                                     'unique': unique,
+                                     'minNodes': minNodes,
+                                     'maxNodes': maxNodes})
+        # No ORDER BY, so rows come straight from the index scan
+        # without being sorted first
+        sql = "SELECT x_size, y_size, cells FROM puzzles" + where
+        if limit != None:
+            sql += " LIMIT ?"
+            params.append(int(limit))
+
+        boards = {}
+        for xSize, ySize, cells in self.__connection.execute(sql, params):
+            if (xSize, ySize) not in boards:
+                boards[(xSize, ySize)] = game_model.BoardType(xSize, ySize)
+            model = data_model.GameModel(boards[(xSize, ySize)])
+            model.getProblem().setCells(cells)
+            yield model
+
+
+
+
+    def _insert(self, models, failed):
+        """
+        Insert (key, GameModel) pairs in a single transaction
+
+        Models that cannot be added are appended to failed as
+        (key, exception) instead of rolling back the transaction.
+        Returns
+        - int number of problems added
+        """
+        def rows():
+            for key, model in models:
+                try:
+                    yield self._row(model.getProblem())
+                except ValueError as e:
+                    failed.append((key, e))
+
+        with self.__connection:
+            before = self.__connection.total_changes
+            self.__connection.executemany(
+                "INSERT OR IGNORE INTO puzzles (x_size, y_size, clues, hash, "
+                "cells, solutions, nodes) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                rows())
+            return self.__connection.total_changes - before
+
+
+
+
+    def _row(self, problem):
+        """
+        Return the database row for problem
+        """
+        board = problem.getBoard()
+        if not board.isStandard():
+            raise ValueError("Only standard boards can be catalogued")
+        if board not in self.__solvers:
+            self.__solvers[board] = solver.BitBoardSolver(board)
+        problemSolver = self.__solvers[board]
+
+        cells = problem.getCells()
+        try:
+            solutions = problemSolver.countSolutions(problem, limit=2,
+                                                     budget=self.__budget())
+            nodes = problemSolver.getStats()['nodes']
+        except solver.BudgetExceeded:
+            solutions = None
+            nodes = None
+        return (board.getXSize(), board.getYSize(),
+                len(cells) - cells.count(0),
+                canonicalHash(problem), bytes(cells), solutions, nodes)
+
+
+
+
+    def _where(self, filters):
+        """
+        Build the WHERE clause and parameters for query filters
+        """
+        clauses = []
+        params = []
+        board = filters.get('board')
+        if board != None:
+            clauses.append("x_size = ? AND y_size = ?")
+            params += [board.getXSize(), board.getYSize()]
+
+        ranges = (('minClues', "clues >= ?"), ('maxClues', "clues <= ?"),
+                  ('minNodes', "nodes >= ?"), ('maxNodes', "nodes <= ?"))
+        for name, clause in ranges:
+            if filters.get(name) != None:
+                clauses.append(clause)
+                params.append(int(filters[name]))
+
+        unique = filters.get('unique')
+        if unique != None:
+            clauses.append("solutions = 1" if unique else "solutions != 1")
+
+        if not clauses:
+            return "", params
+        return " WHERE " + " AND ".join(clauses), params
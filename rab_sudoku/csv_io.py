@@ -1,12 +1,242 @@
 """
 CSV I/O Classes
 """
+import bz2
+import gzip
+import lzma
+import queue
+import threading
+import zlib
+
 from rab_sudoku import game_model, data_model 
 
 class VersionError(Exception):
     """
     Unsupported file version
     """
+    
+    
+    
+    
+# Compression formats as (magic bytes, file extension, open function)
+COMPRESSION_FORMATS = ((b'\x1f\x8b', '.gz', gzip.open),
+                       (b'BZh', '.bz2', bz2.open),
+                       (b'\xfd7zXZ\x00', '.xz', lzma.open))
+
+# Exceptions raised by openModelFile and CsvModelReader for an input
+# that cannot be read, including truncated or corrupt compressed files
+READ_ERRORS = (OSError, EOFError, SyntaxError, ValueError, VersionError,
+               lzma.LZMAError, zlib.error)
+
+
+
+
+def openModelFile(path, mode='r', readAhead=False):
+    """
+    Open a model file for text I/O, handling compressed files
+    
+    Files being read are decompressed if they start with the magic
+    bytes of gzip, bzip2 or xz. Files being written are compressed if
+    the file name ends in .gz, .bz2 or .xz.
+    - path - path of the file
+    - mode - 'r' to read or 'w' to write, with 'b' added for binary I/O
+    - readAhead - if True a file being read is wrapped in a
+      ReadAheadReader, so that decompression and line splitting run
+      on a background thread. This is worth it for large files of
+      many puzzles.
+    Returns
+    - io.TextIOBase, or a binary file object for binary modes
+    """
+    fobj = _openModelFile(path, mode)
+    if readAhead and mode.startswith('r'):
+        return ReadAheadReader(fobj)
+    return fobj
+
+
+
+
+def _openModelFile(path, mode):
+    """
+    Open a model file without read-ahead
+    """
+    if mode not in ('r', 'w', 'rb', 'wb'):
+        raise ValueError("Invalid mode '{0:s}'".format(mode))
+    codecMode = mode if 'b' in mode else mode + 't'
+    
+    if mode.startswith('r'):
+        with open(path, 'rb') as fd:
+            header = fd.read(6)
+        for magic, extension, opener in COMPRESSION_FORMATS:
+            if header.startswith(magic):
+                return opener(path, codecMode)
+    else:
+        for magic, extension, opener in COMPRESSION_FORMATS:
+            if str(path).endswith(extension):
+                return opener(path, codecMode)
+        
+    return open(path, mode)
+
+
+
+
+class ReadAheadReader:
+    """
+    Read lines from a file object on a background thread
+    
+    The thread reads blocks of lines into a bounded queue while the
+    caller parses the lines already read. gzip, bz2 and lzma release
+    the GIL while decompressing, so decompression overlaps with
+    parsing and solving. The queue bound limits the memory used when
+    the caller is slower than the file.
+    
+    Supports iteration over lines, readline(), read() and use as a
+    context manager. Closing the reader closes the file object.
+    """
+    
+    def __init__(self, fobj, maxBlocks=16, blockSize=1 << 20):
+        """
+        - fobj - text or binary file object to read
+        - maxBlocks - int number of blocks of lines held in the queue
+        - blockSize - int approximate size in characters or bytes of
+          each block
+        """
+        self.__fobj = fobj
+        self.__blockSize = blockSize
+        self.__queue = queue.Queue(maxBlocks)
+        self.__stop = threading.Event()
+        self.__empty = fobj.read(0)
+        self.__lines = []
+        self.__pos = 0
+        self.__done = False
+        self.__thread = threading.Thread(target=self._fill, daemon=True)
+        self.__thread.start()
+        
+        
+        
+        
+    def __enter__(self):
+        return self
+        
+        
+        
+        
+    def __exit__(self, *exc):
+        self.close()
+        
+        
+        
+        
+    def __iter__(self):
+        while True:
+            line = self.readline()
+            if not line:
+                return
+            yield line
+            
+            
+            
+            
+    def readline(self):
+        """
+        Return the next line or an empty string at the end of the file
+        """
+        if self.__pos >= len(self.__lines) and not self._nextBlock():
+            return self.__empty
+        line = self.__lines[self.__pos]
+        self.__pos += 1
+        return line
+        
+        
+        
+        
+    def read(self):
+        """
+        Return the rest of the file
+        """
+        parts = [self.__empty.join(self.__lines[self.__pos:])]
+        while self._nextBlock():
+            parts.append(self.__empty.join(self.__lines))
+        self.__lines = []
+        self.__pos = 0
+        return self.__empty.join(parts)
+        
+        
+        
+        
+    def close(self):
+        """
+        Stop the background thread and close the file object
+        """
+        self.__stop.set()
+        while self.__thread.is_alive():
+            # Make room in the queue so the thread can see the stop
+            try:
+                self.__queue.get(timeout=0.1)
+            except queue.Empty:
+                pass
+        self.__fobj.close()
+        
+        
+        
+        
+    def _fill(self):
+        """
+        Background thread reading blocks of lines into the queue
+        
+        An exception from the file is passed on to the reader, and None
+        marks the end of the file.
+        """
+        try:
+            while not self.__stop.is_set():
+                lines = self.__fobj.readlines(self.__blockSize)
+                if not lines:
+                    break
+                self._put(lines)
+        except Exception as e:
+            self._put(e)
+        self._put(None)
+        
+        
+        
+        
+    def _put(self, item):
+        """
+        Put an item on the queue unless the reader is being closed
+        """
+        while not self.__stop.is_set():
+            try:
+                self.__queue.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                pass
+                
+                
+                
+                
+    def _nextBlock(self):
+        """
+        Move to the next block of lines
+        
+        Returns
+        - False at the end of the file
+        """
+        if self.__done:
+            return False
+        item = self.__queue.get()
+        if item == None:
+            self.__done = True
+            self.__lines = []
+            self.__pos = 0
+            return False
+        if isinstance(item, Exception):
+            self.__done = True
+            raise item
+        self.__lines = item
+        self.__pos = 0
+        return True
+
+
+
 
 class CsvLineParser:
     """
@@ -98,6 +328,9 @@ class CsvModelReader:
     def __init__(self):
         self.__parser = CsvLineParser()
         self.__newModel = None
+        self.__regions = []
+        self.__extraUnits = []
+        self.__unitCount = 0
         
         
         
@@ -187,7 +420,9 @@ class CsvModelReader:
         """
         commands = {    'problem:': 'ProblemModel',
                         'solution:': 'SolutionModel',
-                        'dimensions:': 'Dimensions' }
+                        'dimensions:': 'Dimensions',
+                        'regions:': 'Regions',
+                        'units:': 'Units' }
         cmd = None
         cmd_line_no = 0
         
@@ -280,6 +515,187 @@ class CsvModelReader:
             raise SyntaxError("dimensions: defined multiple times")
             
         self.__newModel = data_model.GameModel(game_model.BoardType(x, y))
+        self.__regions = []
+        self.__extraUnits = []
         
         return None
-        
\ No newline at end of file
+        
+        
+        
+        
+    def _cmd1Regions(self, cmd, cmd_line_no, fields):
+        """
+        Read the region number of each cell for irregular boxes
+        
+        The region numbers follow on one line per row, as for problem:
+        """
+        if self.__newModel == None:
+            raise SyntaxError("regions: should come after dimensions:")
+            
+        board = self.__newModel.getBoard()
+        if cmd_line_no == 0:
+            if len(fields) != 1:
+                raise SyntaxError("regions: should be defined on "
+                                  "subsequent lines")
+            if board.getRegions() != None:
+                raise SyntaxError("regions: defined multiple times")
+        else:
+            self.__regions += self._intFields("regions:", cmd_line_no,
+                                              board.getBoardXSize(), fields)
+            if cmd_line_no >= board.getBoardYSize():
+                self._replaceBoard(self.__regions, board.getExtraUnits())
+                cmd = None
+                
+        return cmd
+        
+        
+        
+        
+    def _cmd1Units(self, cmd, cmd_line_no, fields):
+        """
+        Read extra units such as diagonals
+        
+        units:, <count> is followed by count lines, each listing the
+        cells of one unit as indices x + y * board size.
+        """
+        if self.__newModel == None:
+            raise SyntaxError("units: should come after dimensions:")
+            
+        board = self.__newModel.getBoard()
+        if cmd_line_no == 0:
+            if len(fields) != 2:
+                raise SyntaxError("units: should have exactly 1 argument")
+            if board.getExtraUnits():
+                raise SyntaxError("units: defined multiple times")
+            try:
+                self.__unitCount = int(fields[1])
+            except ValueError:
+                raise SyntaxError("units: count must be an integer")
+            if self.__unitCount == 0:
+                cmd = None
+        else:
+            self.__extraUnits.append(self._intFields("units:", cmd_line_no,
+                                                     board.getBoardXSize(),
+                                                     fields))
+            if cmd_line_no >= self.__unitCount:
+                self._replaceBoard(board.getRegions(), self.__extraUnits)
+                cmd = None
+                
+        return cmd
+        
+        
+        
+        
+    def _intFields(self, modelName, cmd_line_no, count, fields):
+        """
+        Convert a line of fields to a list of ints
+        """
+        if len(fields) != count:
+            msg = "{0:s}[{1:d}] invalid number of fields"
+            raise SyntaxError(msg.format(modelName, cmd_line_no))
+        try:
+            return [int(field) for field in fields]
+        except ValueError:
+            msg = "{0:s}[{1:d}] invalid integer"
+            raise SyntaxError(msg.format(modelName, cmd_line_no))
+            
+            
+            
+            
+    def _replaceBoard(self, regions, extraUnits):
+        """
+        Replace the board of the model being read with a variant board
+        
+        Any cells already read are kept.
+        """
+        oldModel = self.__newModel
+        oldBoard = oldModel.getBoard()
+        try:
+            board = game_model.BoardType(oldBoard.getXSize(),
+                                         oldBoard.getYSize(),
+                                         regions, extraUnits)
+        except ValueError as e:
+            raise SyntaxError("Invalid board: {0:s}".format(str(e)))
+            
+        self.__newModel = data_model.GameModel(board)
+        self.__newModel.getProblem().setCells(oldModel.getProblem().getCells())
+        self.__newModel.getSolution().setCells(
+                                        oldModel.getSolution().getCells())
+                
+        
+        
+        
+class CsvModelWriter:
+    """
+    A writer for solution and problem models
+    """
+    
+    def __init__(self):
+        self.__separator = ','
+        
+        
+        
+        
+    def write(self, fobj, model):
+        """
+        Write a GameModel to a CSV io.TextIOBase in format 1.0
+        
+        Attributes:
+        - fobj - io.TextIOBase
+        - model - GameModel
+        """
+        board = model.getBoard()
+        lines = ["version:,1,0",
+                 "",
+                 "dimensions:,{0:d},{1:d}".format(board.getXSize(),
+                                                 board.getYSize())]
+        lines += self._boardLines(board)
+        lines += self._modelLines("problem:", model.getProblem())
+        lines += self._modelLines("solution:", model.getSolution())
+        lines.append("")
+        
+        fobj.write("\n".join(lines))
+        
+        
+        
+        
+    def _boardLines(self, board):
+        """
+        Return the regions: and units: sections for a variant board
+        """
+        size = board.getBoardXSize()
+        lines = []
+        regions = board.getRegions()
+        if regions != None:
+            lines += ["", "regions:"]
+            for y in range(size):
+                row = regions[y * size:(y + 1) * size]
+                lines.append(self.__separator.join(str(region)
+                                                   for region in row))
+                
+        extraUnits = board.getExtraUnits()
+        if extraUnits:
+            lines += ["", "units:,{0:d}".format(len(extraUnits))]
+            for unit in extraUnits:
+                lines.append(self.__separator.join(str(cell)
+                                                   for cell in unit))
+        return lines
+        
+        
+        
+        
+    def _modelLines(self, modelName, model):
+        """
+        Return the lines for a problem: or solution: section
+        
+        Empty cells are written as empty fields.
+        """
+        board = model.getBoard()
+        lines = ["", modelName]
+        for y in range(board.getBoardYSize()):
+            fields = []
+            for x in range(board.getBoardXSize()):
+                value = model.getCell(x, y)
+                fields.append(str(value) if value != 0 else "")
+            lines.append(self.__separator.join(fields))
+        return lines
@@ -1,4 +1,7 @@
-from rab_sudoku import game_model
+import concurrent.futures
+import os
+
+from rab_sudoku import game_model, csv_io
 
 class PlayingData:
     """
@@ -66,6 +69,39 @@ class PlayingData:
         
         self.__cells[x + y * self.__boardType.getBoardXSize()] = value
         
+    def getCells(self):
+        """
+        Get the contents of all cells as a list
+        
+        Cells are ordered left to right, then top to bottom, so the cell
+        at x, y is at index x + y * board x size.
+        """
+        return list(self.__cells)
+        
+        
+    def setCells(self, values):
+        """
+        Set the contents of all cells from a sequence of values
+        
+        values is in the order returned by getCells. This replaces the
+        whole grid at once and is much faster than repeated setCell calls
+        when loading bulk data, e.g. from bytes.
+        """
+        
+        #Validate the parameters
+        
+        cells = list(values)
+        if len(cells) != self.__cellCount:
+            raise ValueError("Expected {0:d} values, got {1:d}".format(
+                                                self.__cellCount, len(cells)))
+        if cells and (min(cells) < 0 or
+                      max(cells) > self.__boardType.getBoardXSize()):
+            raise ValueError("Value out of range")
+        
+        # Set the cell contents
+        
+        self.__cells = cells
+        
     def getBoard(self):
         return self.__boardType
         
@@ -104,16 +140,67 @@ class GameModelController:
         self.__model = None
     
     def loadGame(self, file):
-        reader = CsvModelReader()
-        
-        with open(file, 'r') as fd:
-            newModel = reader.read(fd)
+        """
+        Load a game from a CSV file, which may be compressed
+        """
+        newModel = self._readGame(file)
             
         self.__model = newModel
         
         return newModel
 
+    def loadGames(self, paths, maxWorkers=8):
+        """
+        Load games from several CSV files concurrently
+        
+        Files are read on a pool of threads so that the latency of slow
+        storage overlaps. Results are generated as each file finishes,
+        so one slow file does not hold up the others. The current game
+        is not changed.
+        - paths - sequence of file paths, the path of a directory whose
+          files are all loaded, or the path of a single file
+        - maxWorkers - int number of threads
+        Generates
+        - (path, GameModel, None) for each file that loaded, or
+          (path, None, exception) for each file that failed
+        """
+        if isinstance(paths, (str, bytes, os.PathLike)):
+            if os.path.isdir(paths):
+                directory = paths
+                paths = [os.path.join(directory, name)
+                         for name in sorted(os.listdir(directory))]
+                paths = [path for path in paths if os.path.isfile(path)]
+            else:
+                paths = [paths]
+            
+        # Do not wait for files still being read if the caller stops early
+        executor = concurrent.futures.ThreadPoolExecutor(maxWorkers)
+        try:
+            futures = {executor.submit(self._readGame, path): path
+                       for path in paths}
+            for future in concurrent.futures.as_completed(futures):
+                path = futures[future]
+                try:
+                    yield path, future.result(), None
+                except Exception as e:
+                    yield path, None, e
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+                    
+    def _readGame(self, file):
+        """
+        Read a game from a CSV file without making it the current game
+        """
+        with csv_io.openModelFile(file) as fd:
+            return csv_io.CsvModelReader().read(fd)
+
     def getModel(self):
         return self.__model 
+        
+    def setModel(self, model):
+        """
+        Make model the current game
+        """
+        self.__model = model
     
     
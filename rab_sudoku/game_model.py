@@ -1,10 +1,39 @@
 """Classes for defining sudoku game model"""
 
 class BoardType:
-	"""Class for defining sudoku board"""
-	def __init__(self, xSize = 3, ySize = 3):
+	"""
+	Class for defining sudoku board
+	
+	A standard board has rows, columns and xSize by ySize boxes.
+	Variants are described by:
+	- regions - sequence of region numbers, one per cell in the order
+	  x + y * board size, that replace the boxes (jigsaw sudoku)
+	- extraUnits - sequence of units, each a sequence of cell indices,
+	  that must also hold every value once (diagonals, windows)
+	"""
+	def __init__(self, xSize = 3, ySize = 3, regions = None, extraUnits = None):
 		self.__xSize = int(xSize)
 		self.__ySize = int(ySize)
+		size = self.__xSize * self.__ySize
+		
+		if regions != None:
+			regions = tuple(int(region) for region in regions)
+			if len(regions) != size * size:
+				raise ValueError("regions must have one entry per cell")
+		self.__regions = regions
+		
+		if extraUnits == None:
+			extraUnits = ()
+		self.__extraUnits = tuple(tuple(int(cell) for cell in unit)
+								for unit in extraUnits)
+		self.__units = None
+		
+		# Check that every unit holds each value exactly once
+		for unit in self.getUnits():
+			if len(unit) != size or len(set(unit)) != size:
+				raise ValueError("Every unit must have {0:d} cells".format(size))
+			if min(unit) < 0 or max(unit) >= size * size:
+				raise ValueError("Unit cell outside grid")
 		
 	def getXSize(self):
 		return self.__xSize
@@ -18,4 +47,56 @@ class BoardType:
 	def getBoardYSize(self):
 		return self.__ySize * self.__xSize
 		
+	def getRegions(self):
+		"""Return the region number of each cell or None for boxes"""
+		return self.__regions
+		
+	def getExtraUnits(self):
+		return self.__extraUnits
+		
+	def isStandard(self):
+		"""Return True if the board has boxes and no extra units"""
+		return self.__regions == None and not self.__extraUnits
+		
+	def getUnits(self):
+		"""
+		Return every unit of the board as a tuple of cell indices
+		
+		Units are the rows, then the columns, then the boxes or regions,
+		then any extra units. Cells are numbered x + y * board size.
+		The list is built once and shared.
+		"""
+		if self.__units == None:
+			size = self.getBoardXSize()
+			rows = [tuple(x + y * size for x in range(size))
+					for y in range(size)]
+			cols = [tuple(x + y * size for y in range(size))
+					for x in range(size)]
+			
+			if self.__regions == None:
+				# Boxes are numbered left to right, then top to bottom
+				regions = [(y // self.__ySize) * self.__ySize + x // self.__xSize
+							for y in range(size) for x in range(size)]
+			else:
+				regions = self.__regions
+			boxes = {}
+			for cell, region in enumerate(regions):
+				boxes.setdefault(region, []).append(cell)
+			boxes = [tuple(boxes[region]) for region in sorted(boxes)]
+			
+			self.__units = tuple(rows + cols + boxes) + self.__extraUnits
+		return self.__units
+		
+	def __eq__(self, other):
+		if not isinstance(other, BoardType):
+			return NotImplemented
+		return (self.__xSize == other.getXSize() and
+				self.__ySize == other.getYSize() and
+				self.__regions == other.getRegions() and
+				self.__extraUnits == other.getExtraUnits())
+		
+	def __hash__(self):
+		return hash((self.__xSize, self.__ySize, self.__regions,
+					self.__extraUnits))
+		
 		
@@ -0,0 +1,177 @@
+"""
+Hint Classes
+"""
+import collections
+
+NAKED_SINGLE = 'naked single'
+HIDDEN_SINGLE = 'hidden single'
+
+class HintEngine:
+    """
+    Give the next logical step for a game in progress
+
+    The full sequence of deductions for a problem is worked out once
+    and cached, keyed by the board and the problem cells. Every step
+    on that sequence is forced, so an entry that disagrees with it is a
+    mistake and the hint is the step that corrects it. While the
+    player's entries all agree with the sequence, the next hint is the
+    first step the player has not filled in yet. If the player has
+    filled in cells the sequence does not reach, the hint is worked out
+    from the current board instead.
+
+    Each step is a tuple (x, y, value, rule) where rule is NAKED_SINGLE
+    or HIDDEN_SINGLE.
+    """
+
+    def __init__(self, maxProblems=1000):
+        """
+        - maxProblems - int number of deduction paths kept in the cache
+        """
+        self.__maxProblems = int(maxProblems)
+        if self.__maxProblems < 1:
+            raise ValueError("Cache must hold at least 1 problem")
+        self.__paths = collections.OrderedDict()
+        self.__peers = {}
+
+
+
+
+    def getPath(self, problem):
+        """
+        Return the list of steps that solve problem by logic alone
+
+        The list stops early if no more steps can be found. The result
+        is cached and must not be changed.
+        - problem - PlayingData
+        """
+        key = (problem.getBoard(), bytes(problem.getCells()))
+        path = self.__paths.get(key)
+        if path == None:
+            path = self._deduce(problem.getBoard(), problem.getCells())
+            self.__paths[key] = path
+            if len(self.__paths) > self.__maxProblems:
+                self.__paths.popitem(last=False)
+        else:
+            self.__paths.move_to_end(key)
+        return path
+
+
+
+
+    def nextHint(self, model):
+        """
+        Return the next step for a game or None if there is none
+
+        If the player has made a mistake the step is the correct value
+        for that cell, which the player has already filled in.
+        - model - GameModel whose solution holds the player's entries
+        """
+        board = model.getBoard()
+        size = board.getBoardXSize()
+        problem = model.getProblem()
+        entries = model.getSolution().getCells()
+
+        path = self.getPath(problem)
+        pathSteps = {step[0] + step[1] * size: step for step in path}
+        onPath = True
+        for cell, value in enumerate(entries):
+            if value == 0:
+                continue
+            step = pathSteps.get(cell)
+            if step == None:
+                onPath = False
+            elif step[2] != value:
+                # A wrong entry, so give the correct value for the cell
+                return step
+
+        if onPath:
+            for step in path:
+                if entries[step[0] + step[1] * size] == 0:
+                    return step
+            return None
+
+        # Past the end of the cached path, so start again from the
+        # current board
+        cells = [given if given != 0 else entry
+                 for given, entry in zip(problem.getCells(), entries)]
+        path = self._deduce(board, cells, 1)
+        if path:
+            return path[0]
+        return None
+
+
+
+
+    def _boardPeers(self, board):
+        """
+        Return the set of peers of each cell of board
+        """
+        if board not in self.__peers:
+            size = board.getBoardXSize()
+            peers = [set() for cell in range(size * size)]
+            for unit in board.getUnits():
+                for cell in unit:
+                    peers[cell].update(unit)
+            for cell, cellPeers in enumerate(peers):
+                cellPeers.discard(cell)
+            self.__peers[board] = peers
+        return self.__peers[board]
+
+
+
+
+    def _deduce(self, board, cells, maxSteps=None):
+        """
+        Find the naked and hidden singles that follow from cells
+
+        Naked singles are preferred over hidden singles, and cells are
+        searched in order, so the path is the same on every run.
+        - cells - list of cell values in the order used by
+          PlayingData.setCells
+        - maxSteps - int stop after this many steps or None
+        Returns
+        - list of steps
+        """
+        size = board.getBoardXSize()
+        units = board.getUnits()
+        peers = self._boardPeers(board)
+        cells = list(cells)
+
+        candidates = []
+        for cell, value in enumerate(cells):
+            if value != 0:
+                candidates.append(set())
+            else:
+                candidates.append(set(range(1, size + 1)) -
+                                  set(cells[peer] for peer in peers[cell]))
+
+        path = []
+        while maxSteps == None or len(path) < maxSteps:
+            step = None
+            for cell, cellCandidates in enumerate(candidates):
+                if cells[cell] == 0 and len(cellCandidates) == 1:
+                    step = (cell, next(iter(cellCandidates)), NAKED_SINGLE)
+                    break
+
+            if step == None:
+                for unit in units:
+                    for value in range(1, size + 1):
+                        places = [cell for cell in unit
+                                  if value in candidates[cell]]
+                        if len(places) == 1:
+                            step = (places[0], value, HIDDEN_SINGLE)
+                            break
+                    if step != None:
+                        break
+
+            if step == None:
+                break
+
+            cell, value, rule = step
+            cells[cell] = value
+            candidates[cell] = set()
+            for peer in peers[cell]:
+                candidates[peer].discard(value)
+            path.append((cell % size, cell // size, value, rule))
+
+        return path
@@ -0,0 +1,199 @@
+"""
+One line per puzzle I/O Classes
+
+Each line of the file holds one problem as board size * board size
+symbols, read left to right, then top to bottom. '0' or '.' mark an
+empty cell. This is the usual interchange format for 9x9 puzzles,
+e.g. "53..7....6..195..." and extends to larger boards by using more
+symbols in the alphabet.
+
+Files are read and written in binary mode so that lines can be
+converted with bytes.translate.
+"""
+import array
+
+from rab_sudoku import data_model
+
+DEFAULT_ALPHABET = b'123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ'
+BLANK_SYMBOLS = b'0.'
+
+# Number of lines written in each call to the file object
+WRITE_CHUNK_LINES = 10000
+
+
+
+
+def _boardAlphabet(board, alphabet):
+    """
+    Return the symbols for the values 1 to board size as bytes
+    """
+    if alphabet == None:
+        alphabet = DEFAULT_ALPHABET
+    size = board.getBoardXSize()
+    if len(alphabet) < size:
+        msg = "Alphabet has {0:d} symbols but the board needs {1:d}"
+        raise ValueError(msg.format(len(alphabet), size))
+    alphabet = bytes(alphabet[:size])
+    if len(set(alphabet)) != size:
+        raise ValueError("Alphabet contains repeated symbols")
+    return alphabet
+
+
+
+
+class LineModelReader:
+    """
+    A reader for problems in one line per puzzle format
+    """
+
+    def __init__(self, board, alphabet=None):
+        """
+        - board - BoardType of every problem in the file
+        - alphabet - bytes of the symbols for the values 1, 2, ...
+          Defaults to DEFAULT_ALPHABET.
+        """
+        self.__board = board
+        self.__cellCount = board.getBoardXSize() * board.getBoardYSize()
+        alphabet = _boardAlphabet(board, alphabet)
+
+        # Anything not in the alphabet or a blank symbol maps to 0xff
+        table = bytearray(b'\xff' * 256)
+        for symbol in BLANK_SYMBOLS:
+            if symbol not in alphabet:
+                table[symbol] = 0
+        for value, symbol in enumerate(alphabet, 1):
+            table[symbol] = value
+        self.__table = bytes(table)
+
+
+
+
+    def decode(self, line):
+        """
+        Decode one line into bytes holding one value per cell
+
+        Returns
+        - bytes in the order used by PlayingData.setCells
+        """
+        cells = line.strip().translate(self.__table)
+        if len(cells) != self.__cellCount:
+            msg = "Expected {0:d} cells, got {1:d}"
+            raise SyntaxError(msg.format(self.__cellCount, len(cells)))
+        if b'\xff' in cells:
+            raise SyntaxError("Invalid symbol in line")
+        return cells
+
+
+
+
+    def readModels(self, fobj):
+        """
+        Generate a GameModel for each problem in a binary file object
+
+        Blank lines are skipped.
+        """
+        for lineNo, line in enumerate(fobj, 1):
+            if not line.strip():
+                continue
+            try:
+                cells = self.decode(line)
+            except SyntaxError as e:
+                raise SyntaxError("Line {0:d}: {1:s}".format(lineNo, str(e)))
+            model = data_model.GameModel(self.__board)
+            model.getProblem().setCells(cells)
+            yield model
+
+
+
+
+    def readPacked(self, fobj):
+        """
+        Decode every problem in a binary file object into a packed array
+
+        Returns
+        - array.array('B') holding the cells of each problem in turn, so
+          problem n starts at n * board size * board size
+        """
+        lines = fobj.read().split()
+        for lineNo, line in enumerate(lines, 1):
+            if len(line) != self.__cellCount:
+                msg = "Problem {0:d}: expected {1:d} cells, got {2:d}"
+                raise SyntaxError(msg.format(lineNo, self.__cellCount,
+                                             len(line)))
+
+        cells = b''.join(lines).translate(self.__table)
+        if b'\xff' in cells:
+            lineNo = cells.index(b'\xff') // self.__cellCount + 1
+            raise SyntaxError("Problem {0:d}: invalid symbol".format(lineNo))
+        return array.array('B', cells)
+
+
+
+
+class LineModelWriter:
+    """
+    A writer for problems in one line per puzzle format
+    """
+
+    def __init__(self, board, alphabet=None, blank=b'.'):
+        """
+        - board - BoardType of every problem written
+        - alphabet - bytes of the symbols for the values 1, 2, ...
+          Defaults to DEFAULT_ALPHABET.
+        - blank - bytes symbol for an empty cell
+        """
+        alphabet = _boardAlphabet(board, alphabet)
+        if len(blank) != 1 or blank in alphabet:
+            raise ValueError("Blank must be one symbol not in the alphabet")
+
+        table = bytearray(256)
+        table[0] = blank[0]
+        table[1:len(alphabet) + 1] = alphabet
+        self.__table = bytes(table)
+
+
+
+
+    def encode(self, data):
+        """
+        Encode PlayingData as one line, without the line ending
+        """
+        return bytes(data.getCells()).translate(self.__table)
+
+
+
+
+    def write(self, fobj, models):
+        """
+        Write the problems of a sequence of GameModels to a binary file
+        object, one per line
+        """
+        self.writeGrids(fobj, (model.getProblem().getCells()
+                               for model in models))
+
+
+
+
+    def writeGrids(self, fobj, grids):
+        """
+        Write a sequence of grids to a binary file object, one per line
+
+        Each grid is a sequence of cell values in the order used by
+        PlayingData.setCells, e.g. the bytes generated by
+        BitBoardSolver.iterSolutions. grids may be a generator; lines
+        are collected and written in large chunks.
+        Returns
+        - int number of grids written
+        """
+        count = 0
+        lines = []
+        for grid in grids:
+            lines.append(bytes(grid).translate(self.__table))
+            if len(lines) >= WRITE_CHUNK_LINES:
+                fobj.write(b'\n'.join(lines) + b'\n')
+                count += len(lines)
+                lines = []
+        if lines:
+            fobj.write(b'\n'.join(lines) + b'\n')
+            count += len(lines)
+        return count
@@ -0,0 +1,180 @@
+"""
+Game session Classes
+"""
+import array
+import collections
+
+from rab_sudoku import data_model
+
+class SessionStore:
+    """
+    Holds a GameModelController for each of many game sessions
+
+    Only the most recently used sessions are kept as controllers. Older
+    sessions are packed into bytes holding a reference to their problem
+    and the cells the player has entered, and are unpacked again when
+    they are next used. Problems are shared between sessions that play
+    the same puzzle.
+
+    Callers should not hold on to a controller from get() while other
+    sessions are used, because changes made after it has been packed
+    are lost.
+    """
+
+    def __init__(self, maxActive=1000):
+        """
+        - maxActive - int maximum number of sessions kept unpacked
+        """
+        self.__maxActive = int(maxActive)
+        if self.__maxActive < 1:
+            raise ValueError("At least 1 session must be active")
+        self.__active = collections.OrderedDict()
+        self.__packed = {}
+        # Problem id -> [board, problem cells, session count]
+        self.__problems = {}
+        # (board, problem cells) -> problem id
+        self.__problemIds = {}
+        self.__nextProblemId = 0
+
+
+
+
+    def __len__(self):
+        return len(self.__active) + len(self.__packed)
+
+
+
+
+    def __contains__(self, sessionId):
+        return sessionId in self.__active or sessionId in self.__packed
+
+
+
+
+    def getActiveCount(self):
+        return len(self.__active)
+
+
+
+
+    def add(self, sessionId, controller):
+        """
+        Add a session, replacing any session with the same id
+        """
+        self.remove(sessionId)
+        self.__active[sessionId] = controller
+        self._evict()
+
+
+
+
+    def get(self, sessionId):
+        """
+        Return the GameModelController for a session
+
+        A packed session is unpacked and becomes the most recently used.
+        Raises KeyError if there is no such session.
+        """
+        if sessionId in self.__active:
+            self.__active.move_to_end(sessionId)
+            return self.__active[sessionId]
+
+        controller = self._unpack(self.__packed.pop(sessionId))
+        self.__active[sessionId] = controller
+        self._evict()
+        return controller
+
+
+
+
+    def remove(self, sessionId):
+        """
+        Remove a session if it exists
+        """
+        self.__active.pop(sessionId, None)
+        packed = self.__packed.pop(sessionId, None)
+        if packed != None:
+            self._releaseProblem(packed[0])
+
+
+
+
+    def _evict(self):
+        """
+        Pack the least recently used sessions until few enough are active
+        """
+        while len(self.__active) > self.__maxActive:
+            sessionId, controller = self.__active.popitem(last=False)
+            self.__packed[sessionId] = self._pack(controller)
+
+
+
+
+    def _pack(self, controller):
+        """
+        Pack a controller into (problem id, entries)
+
+        entries is bytes holding a pair of unsigned shorts, cell index
+        and value, for each cell the player has filled in.
+        """
+        model = controller.getModel()
+        if model == None:
+            return (None, b'')
+
+        key = (model.getBoard(), bytes(model.getProblem().getCells()))
+        problemId = self.__problemIds.get(key)
+        if problemId == None:
+            problemId = self.__nextProblemId
+            self.__nextProblemId += 1
+            self.__problemIds[key] = problemId
+            self.__problems[problemId] = [key[0], key[1], 0]
+        self.__problems[problemId][2] += 1
+
+        entries = array.array('H')
+        for cell, value in enumerate(model.getSolution().getCells()):
+            if value != 0:
+                entries.append(cell)
+                entries.append(value)
+        return (problemId, entries.tobytes())
+
+
+
+
+    def _unpack(self, packed):
+        """
+        Rebuild a controller from (problem id, entries)
+        """
+        problemId, packedEntries = packed
+        controller = data_model.GameModelController()
+        if problemId == None:
+            return controller
+
+        board, problemCells, count = self.__problems[problemId]
+        model = data_model.GameModel(board)
+        model.getProblem().setCells(problemCells)
+
+        entries = array.array('H')
+        entries.frombytes(packedEntries)
+        cells = [0] * len(problemCells)
+        for i in range(0, len(entries), 2):
+            cells[entries[i]] = entries[i + 1]
+        model.getSolution().setCells(cells)
+
+        self._releaseProblem(problemId)
+        controller.setModel(model)
+        return controller
+
+
+
+
+    def _releaseProblem(self, problemId):
+        """
+        Drop a shared problem when no packed session refers to it
+        """
+        if problemId == None:
+            return
+        problem = self.__problems[problemId]
+        problem[2] -= 1
+        if problem[2] == 0:
+            del self.__problems[problemId]
+            del self.__problemIds[(problem[0], problem[1])]
@@ -0,0 +1,562 @@
+"""
+Solver Classes
+"""
+import collections
+import threading
+import time
+
+from rab_sudoku import data_model
+
+class BudgetExceeded(Exception):
+    """
+    A search ran out of its budget or was cancelled
+
+    Attributes:
+    - reason - str one of 'nodes', 'time', 'states' or 'cancelled'
+    - stats - dict of search statistics at the point the search stopped
+    """
+
+    def __init__(self, reason, stats):
+        super().__init__("Search budget exceeded: {0:s}".format(reason))
+        self.reason = reason
+        self.stats = stats
+
+
+
+
+class SearchBudget:
+    """
+    Limits on a single solver call
+
+    A budget can also be cancelled from another thread. The solver
+    checks it at every search node, so cancellation is cooperative.
+    - maxNodes - int maximum number of search nodes or None
+    - maxTime - float maximum wall time in seconds or None
+    - maxStates - int maximum number of pending search states held in
+      memory or None
+    """
+
+    def __init__(self, maxNodes=None, maxTime=None, maxStates=None):
+        self.__maxNodes = maxNodes
+        self.__maxTime = maxTime
+        self.__maxStates = maxStates
+        self.__cancelled = threading.Event()
+
+
+
+
+    def cancel(self):
+        """
+        Ask any search using this budget to stop
+        """
+        self.__cancelled.set()
+
+
+
+
+    def isCancelled(self):
+        return self.__cancelled.is_set()
+
+
+
+
+    def check(self, stats):
+        """
+        Raise BudgetExceeded if stats are outside this budget
+        """
+        if self.__cancelled.is_set():
+            raise BudgetExceeded('cancelled', stats)
+        if self.__maxNodes != None and stats['nodes'] > self.__maxNodes:
+            raise BudgetExceeded('nodes', stats)
+        if self.__maxStates != None and stats['states'] > self.__maxStates:
+            raise BudgetExceeded('states', stats)
+        if self.__maxTime != None and stats['elapsed'] > self.__maxTime:
+            raise BudgetExceeded('time', stats)
+
+
+
+
+class TranspositionTable:
+    """
+    A bounded cache of solution counts for search states
+
+    Keys are the candidate planes of a state after propagation. These
+    only describe the remaining subproblem together with the units of
+    the board, so a table is bound to the board of the first solver
+    that uses it and may not be shared with solvers for other boards.
+    A count of 0 records a dead end. When the table is full the least
+    recently used entry is evicted.
+    """
+
+    def __init__(self, maxEntries=100000):
+        self.__maxEntries = int(maxEntries)
+        if self.__maxEntries < 1:
+            raise ValueError("Table must hold at least 1 entry")
+        self.__entries = collections.OrderedDict()
+        self.__hits = 0
+        self.__misses = 0
+        self.__evictions = 0
+        self.__board = None
+
+
+
+
+    def bind(self, board):
+        """
+        Bind the table to board
+
+        Raises ValueError if the table is already bound to another board.
+        """
+        if self.__board == None:
+            self.__board = board
+        elif self.__board != board:
+            raise ValueError("Table is in use for another board type")
+
+
+
+
+    def get(self, key):
+        """
+        Return the solution count stored for key or None
+        """
+        count = self.__entries.get(key)
+        if count == None:
+            self.__misses += 1
+        else:
+            self.__hits += 1
+            self.__entries.move_to_end(key)
+        return count
+
+
+
+
+    def put(self, key, count):
+        """
+        Store the exact solution count for key
+        """
+        self.__entries[key] = count
+        self.__entries.move_to_end(key)
+        if len(self.__entries) > self.__maxEntries:
+            self.__entries.popitem(last=False)
+            self.__evictions += 1
+
+
+
+
+    def getStats(self):
+        """
+        Return a dict of table statistics
+
+        - entries, hits, misses, evictions - int
+        - hitRate - float fraction of lookups that found an entry
+        """
+        lookups = self.__hits + self.__misses
+        return {'entries': len(self.__entries),
+                'hits': self.__hits,
+                'misses': self.__misses,
+                'evictions': self.__evictions,
+                'hitRate': self.__hits / lookups if lookups else 0.0}
+
+
+
+
+class BitBoardSolver:
+    """
+    Solve problems using whole-board bit planes.
+
+    The candidates for each digit are held in a single int with one bit
+    per cell (bit x + y * board size). Eliminating a digit from a row,
+    column or box is then a mask over the whole plane, and copying the
+    search state while branching is a copy of a short list of ints.
+    Variant boards are handled by building the masks from the units of
+    the BoardType.
+
+    A TranspositionTable may be given to keep the solution counts of
+    subproblems between calls to countSolutions. This pays off when
+    counting related problems, e.g. while removing givens one at a time
+    to check that a problem stays unique. Within one search each branch
+    fixes a different value for a cell, so the same state is never
+    reached twice. A table may be shared between solvers for the same
+    board only; ValueError is raised for a solver with another board.
+    """
+
+    def __init__(self, board, table=None):
+        self.__board = board
+        self.__table = table
+        if table != None:
+            table.bind(board)
+        self.__size = board.getBoardXSize()
+        self.__cellCount = self.__size * board.getBoardYSize()
+        self.__allCells = (1 << self.__cellCount) - 1
+        self.__units = []
+        self.__peers = []
+        self.__stats = None
+        self._buildMasks()
+
+
+
+
+    def getBoard(self):
+        return self.__board
+
+
+
+
+    def getStats(self):
+        """
+        Return a dict of statistics for the last search started
+
+        Each search keeps its own statistics and start time, so a
+        suspended iterSolutions generator is not affected by later
+        searches, but its statistics are only returned here until the
+        next search starts.
+
+        - nodes - int number of search states visited
+        - states - int largest number of pending states held at once
+        - elapsed - float wall time in seconds
+        - solutions - int number of solutions found
+        """
+        return self.__stats
+
+
+
+
+    def solve(self, problem, budget=None):
+        """
+        Solve a problem
+
+        - problem - PlayingData containing the givens
+        - budget - SearchBudget or None for an unlimited search
+        Returns
+        - PlayingData containing the first solution found or None if
+          the problem cannot be solved
+        Raises BudgetExceeded if the budget runs out first.
+        """
+        for grid in self._solutions(problem, budget):
+            return self._toPlayingData(grid)
+        return None
+
+
+
+
+    def countSolutions(self, problem, limit=None, budget=None):
+        """
+        Count the solutions to a problem
+
+        - problem - PlayingData containing the givens
+        - limit - int stop counting after this many solutions or None
+          to count them all. A limit of 2 is enough to check that a
+          problem has a unique solution.
+        - budget - SearchBudget or None for an unlimited search
+        Returns
+        - int number of solutions found
+        Raises BudgetExceeded if the budget runs out first.
+        """
+        stats, start = self._newStats()
+        count = self._count(self._initialPlanes(problem), 0, limit,
+                            stats, start, budget, 0)[0]
+        if limit != None:
+            count = min(count, limit)
+        return count
+
+
+
+
+    def iterSolutions(self, problem, limit=None, budget=None):
+        """
+        Generate the solutions to a problem one at a time
+
+        The search is suspended between solutions, so only the pending
+        search states are held in memory, however many solutions there
+        are. Pass the result to LineModelWriter.writeGrids to stream the
+        solutions to a file.
+        - problem - PlayingData containing the givens
+        - limit - int stop after this many solutions or None for all
+        - budget - SearchBudget or None for an unlimited search
+        Generates
+        - bytes holding the value of each cell in the order used by
+          PlayingData.setCells
+        Raises BudgetExceeded if the budget runs out first.
+        """
+        count = 0
+        if limit != None and limit < 1:
+            return
+        for grid in self._solutions(problem, budget):
+            yield grid
+            count += 1
+            if limit != None and count >= limit:
+                return
+
+
+
+
+    def _buildMasks(self):
+        """
+        Build a mask for each unit of the board and the peers of each cell
+        """
+        self.__units = []
+        for unit in self.__board.getUnits():
+            mask = 0
+            for cell in unit:
+                mask |= 1 << cell
+            self.__units.append(mask)
+
+        self.__peers = [0] * self.__cellCount
+        for unit in self.__units:
+            for cell in self._bits(unit):
+                self.__peers[cell] |= unit
+        for cell in range(self.__cellCount):
+            self.__peers[cell] &= ~(1 << cell)
+
+
+
+
+    def _bits(self, mask):
+        """
+        Generate the indices of the bits set in mask, lowest first
+        """
+        while mask:
+            low = mask & -mask
+            yield low.bit_length() - 1
+            mask ^= low
+
+
+
+
+    def _initialPlanes(self, problem):
+        """
+        Convert the givens in problem into candidate planes
+
+        Returns
+        - list of ints, one candidate plane per digit. Index 0 is the
+          plane for digit 1.
+        """
+        if problem.getBoard() != self.__board:
+            raise ValueError("Problem does not match the solver board")
+
+        planes = [self.__allCells] * self.__size
+        for y in range(self.__size):
+            for x in range(self.__size):
+                value = problem.getCell(x, y)
+                if value != 0:
+                    bit = 1 << (x + y * self.__size)
+                    for digit in range(self.__size):
+                        if digit != value - 1:
+                            planes[digit] &= ~bit
+        return planes
+
+
+
+
+    def _propagate(self, planes, filled):
+        """
+        Place naked and hidden singles until nothing changes
+
+        planes is updated in place.
+        Returns
+        - int mask of the filled cells or None if a contradiction was found
+        """
+        allCells = self.__allCells
+        peers = self.__peers
+        units = self.__units
+        size = self.__size
+
+        while True:
+            # Count candidates per cell across all planes at once
+            ones = twos = 0
+            for plane in planes:
+                twos |= ones & plane
+                ones |= plane
+            if allCells & ~ones:
+                return None
+            singles = ones & ~twos & ~filled
+
+            if not singles:
+                # Look for digits with a single place left in a unit
+                for digit in range(size):
+                    plane = planes[digit]
+                    for unit in units:
+                        places = plane & unit
+                        if not places:
+                            return None
+                        if places & (places - 1) == 0 and not places & filled:
+                            singles |= places
+                            for other in range(size):
+                                if other != digit:
+                                    planes[other] &= ~places
+                if not singles:
+                    return filled
+
+            for digit in range(size):
+                placed = singles & planes[digit]
+                if placed:
+                    eliminate = 0
+                    for cell in self._bits(placed):
+                        eliminate |= peers[cell]
+                    planes[digit] &= ~eliminate
+            filled |= singles
+
+
+
+
+    def _chooseCell(self, planes, filled):
+        """
+        Choose an open cell to branch on, preferring cells with two
+        candidates
+        """
+        ones = twos = threes = 0
+        for plane in planes:
+            threes |= twos & plane
+            twos |= ones & plane
+            ones |= plane
+        open_cells = self.__allCells & ~filled
+        pairs = open_cells & twos & ~threes
+        choice = pairs if pairs else open_cells
+        return (choice & -choice).bit_length() - 1
+
+
+
+
+    def _newStats(self):
+        """
+        Start the statistics for a new search
+
+        Returns
+        - dict of statistics for the search
+        - float start time of the search
+        """
+        self.__stats = {'nodes': 0, 'states': 1, 'elapsed': 0.0,
+                        'solutions': 0}
+        return self.__stats, time.monotonic()
+
+
+
+
+    def _visit(self, stats, start, budget, states):
+        """
+        Update the statistics for a search node and check the budget
+
+        - states - int number of pending states held by the search
+        """
+        stats['nodes'] += 1
+        stats['states'] = max(stats['states'], states)
+        stats['elapsed'] = time.monotonic() - start
+        if budget != None:
+            budget.check(stats)
+
+
+
+
+    def _branches(self, planes, filled):
+        """
+        Return the states for each candidate of the chosen cell,
+        lowest digit first
+        """
+        bit = 1 << self._chooseCell(planes, filled)
+        branches = []
+        for digit in range(self.__size):
+            if planes[digit] & bit:
+                branch = [plane & ~bit for plane in planes]
+                branch[digit] = planes[digit]
+                branches.append(branch)
+        return branches
+
+
+
+
+    def _solutions(self, problem, budget=None):
+        """
+        Generate the solutions of problem as lists of cell values
+        """
+        stats, start = self._newStats()
+
+        stack = [(self._initialPlanes(problem), 0)]
+        while stack:
+            self._visit(stats, start, budget, len(stack))
+
+            planes, filled = stack.pop()
+            filled = self._propagate(planes, filled)
+            if filled == None:
+                continue
+            if filled == self.__allCells:
+                stats['solutions'] += 1
+                yield self._toGrid(planes)
+                continue
+
+            # Push in reverse so that lower digits are tried first
+            stack.extend((branch, filled) for branch in
+                         reversed(self._branches(planes, filled)))
+
+
+
+
+    def _count(self, planes, filled, limit, stats, start, budget, pending):
+        """
+        Count the solutions below a search state
+
+        Exact counts are stored in the transposition table, if there is
+        one. A count that stopped at limit is not exact.
+        - pending - int number of untried branches held by the callers.
+          With the current state this is the same as the stack length
+          of the iterative search, so budgets on states mean the same.
+        Returns
+        - count - int number of solutions found
+        - exact - True if count is the full number of solutions
+        """
+        self._visit(stats, start, budget, pending + 1)
+
+        filled = self._propagate(planes, filled)
+        if filled == None:
+            return 0, True
+        if filled == self.__allCells:
+            stats['solutions'] += 1
+            return 1, True
+
+        key = None
+        if self.__table != None:
+            key = tuple(planes)
+            count = self.__table.get(key)
+            if count != None:
+                stats['solutions'] += count
+                return count, True
+
+        count = 0
+        branches = self._branches(planes, filled)
+        for i, branch in enumerate(branches):
+            remaining = None if limit == None else limit - count
+            found, exact = self._count(branch, filled, remaining, stats,
+                                       start, budget,
+                                       pending + len(branches) - i - 1)
+            count += found
+            if not exact:
+                return count, False
+            if limit != None and count >= limit and i < len(branches) - 1:
+                return count, False
+
+        if key != None:
+            self.__table.put(key, count)
+        return count, True
+
+
+
+
+    def _toGrid(self, planes):
+        """
+        Convert solved planes into bytes of cell values
+        """
+        grid = bytearray(self.__cellCount)
+        for digit, plane in enumerate(planes):
+            for cell in self._bits(plane):
+                grid[cell] = digit + 1
+        return bytes(grid)
+
+
+
+
+    def _toPlayingData(self, grid):
+        """
+        Convert bytes of cell values into PlayingData
+        """
+        result = data_model.PlayingData(self.__board)
+        result.setCells(grid)
+        return result
@@ -0,0 +1,164 @@
+"""
+Test cases for classes in batch.py
+
+These cover solving batches of problem files with checkpoints
+"""
+
+import unittest
+import sys
+import os
+import tempfile
+import gzip
+
+# If this test is being executed standalone, add '..' to the path
+# to start searching for packages from the top level of the app.
+if __name__ == "__main__":
+    sys.path.insert(0, '..')
+
+from rab_sudoku import data_model
+from rab_sudoku import game_model
+from rab_sudoku import csv_io
+from rab_sudoku import line_io
+from rab_sudoku import solver
+from rab_sudoku import batch
+
+class TestBatchSolver(unittest.TestCase):
+    """
+    Test case for rab_sudoku.batch.BatchSolver
+    """
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.inputDir = os.path.join(self.tmpdir.name, "in")
+        self.output = os.path.join(self.tmpdir.name, "results.txt")
+        os.mkdir(self.inputDir)
+        self.checkpoint = os.path.join(self.tmpdir.name, "checkpoint")
+
+        self.paths = []
+        writer = csv_io.CsvModelWriter()
+        for i in range(5):
+            model = data_model.GameModel(game_model.BoardType(2, 2))
+            model.getProblem().setCell(0, 0, i % 4 + 1)
+            if i == 3:
+                # Conflicting givens make this problem unsolvable
+                model.getProblem().setCell(1, 0, i % 4 + 1)
+            path = os.path.join(self.inputDir, "{0:d}.csv".format(i))
+            with open(path, 'w') as fd:
+                writer.write(fd, model)
+            self.paths.append(path)
+
+
+
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+
+
+
+    def testRun(self):
+        """
+        Test that a result line is written for every input
+        """
+        self.paths.append(os.path.join(self.inputDir, "missing.csv"))
+        unsolved, failed = batch.BatchSolver(2).run(self.paths, self.output,
+                                                    self.checkpoint)
+        self.assertEqual([self.paths[3]], unsolved)
+        self.assertEqual([self.paths[5]], [path for path, e in failed])
+        self.assertIsInstance(failed[0][1], FileNotFoundError)
+
+        with open(self.output, 'rb') as fd:
+            lines = fd.read().split(b'\n')
+        self.assertEqual(7, len(lines))
+        self.assertEqual(b'', lines[3])
+        self.assertEqual(b'', lines[5])
+        self.assertEqual(b'', lines[6])
+        self.assertEqual((6, os.path.getsize(self.output)),
+                         batch.BatchSolver().readCheckpoint(self.checkpoint))
+
+        reader = line_io.LineModelReader(game_model.BoardType(2, 2))
+        for i in (0, 1, 2, 4):
+            problem = next(reader.readModels([lines[i]])).getProblem()
+            self.assertEqual(i % 4 + 1, problem.getCell(0, 0))
+            self.assertNotIn(0, problem.getCells())
+
+
+
+
+    def testBadInputs(self):
+        """
+        Test that inputs that cannot be read are recorded as failed
+        """
+        with open(self.paths[0], 'rb') as fd:
+            data = gzip.compress(fd.read())
+        bad = {"truncated.csv.gz": data[:len(data) // 2],
+               "version.csv": b"version:,2,0\n",
+               "empty.csv": b"version:,1,0\n\n"}
+        paths = []
+        for name, content in sorted(bad.items()):
+            path = os.path.join(self.inputDir, name)
+            with open(path, 'wb') as fd:
+                fd.write(content)
+            paths.append(path)
+        paths.append(self.paths[0])
+
+        unsolved, failed = batch.BatchSolver().run(paths, self.output,
+                                                   self.checkpoint)
+        self.assertEqual([], unsolved)
+        self.assertEqual(paths[:3], [path for path, e in failed])
+        self.assertIsInstance(failed[0][1], SyntaxError)
+        self.assertIsInstance(failed[1][1], EOFError)
+        self.assertIsInstance(failed[2][1], csv_io.VersionError)
+        with open(self.output, 'rb') as fd:
+            lines = fd.read().split(b'\n')
+        self.assertEqual([b'', b'', b'', 16, b''],
+                         lines[:3] + [len(lines[3])] + lines[4:])
+
+
+
+
+    def testResume(self):
+        """
+        Test that a resumed batch skips the completed inputs and drops
+        results written after the checkpoint
+        """
+        batchSolver = batch.BatchSolver()
+        batchSolver.run(self.paths[:4], self.output, self.checkpoint)
+        offset = os.path.getsize(self.output)
+        with open(self.output, 'ab') as fd:
+            fd.write(b"partial")
+
+        os.remove(self.paths[0])
+        unsolved, failed = batchSolver.run(self.paths, self.output,
+                                           self.checkpoint, resume=True)
+        self.assertEqual(([], []), (unsolved, failed))
+        with open(self.output, 'rb') as fd:
+            lines = fd.read().split(b'\n')
+        self.assertEqual(6, len(lines))
+        self.assertEqual(16, len(lines[4]))
+        self.assertEqual((5, offset + 17),
+                         batchSolver.readCheckpoint(self.checkpoint))
+
+        # Without the results file the checkpoint cannot be used
+        os.remove(self.output)
+        self.assertRaises(FileNotFoundError, batchSolver.run, self.paths,
+                          self.output, self.checkpoint, resume=True)
+        self.assertFalse(os.path.exists(self.output))
+
+
+
+
+    def testBudget(self):
+        """
+        Test that problems that run out of budget are reported unsolved
+        """
+        budget = lambda: solver.SearchBudget(maxNodes=0)
+        unsolved, failed = batch.BatchSolver(budget=budget).run(self.paths,
+                                                                self.output)
+        self.assertEqual(self.paths, unsolved)
+
+
+
+
+if __name__ == "__main__":
+    unittest.main()
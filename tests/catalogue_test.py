@@ -0,0 +1,215 @@
+"""
+Test cases for classes in catalogue.py
+
+These cover storing and querying problems in a catalogue
+"""
+
+import unittest
+import sys
+import os
+import sqlite3
+import tempfile
+import gzip
+
+# If this test is being executed standalone, add '..' to the path
+# to start searching for packages from the top level of the app.
+if __name__ == "__main__":
+    sys.path.insert(0, '..')
+
+from rab_sudoku import data_model
+from rab_sudoku import game_model
+from rab_sudoku import csv_io
+from rab_sudoku import solver
+from rab_sudoku import catalogue
+
+class TestCatalogue(unittest.TestCase):
+    """
+    Test case for rab_sudoku.catalogue.Catalogue
+    """
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.catalogue = catalogue.Catalogue(
+                            os.path.join(self.tmpdir.name, "puzzles.db"))
+        self.board22 = game_model.BoardType(2, 2)
+        self.board23 = game_model.BoardType(2, 3)
+
+
+
+
+    def tearDown(self):
+        self.catalogue.close()
+        self.tmpdir.cleanup()
+
+
+
+
+    def _model(self, board, givens):
+        """
+        Create a GameModel with givens as a sequence of (x, y, value)
+        """
+        model = data_model.GameModel(board)
+        for x, y, value in givens:
+            model.getProblem().setCell(x, y, value)
+        return model
+
+
+
+
+    def testCanonicalHash(self):
+        """
+        Test that swapping digits does not change the hash
+        """
+        first = self._model(self.board22, ((0, 0, 1), (1, 0, 2)))
+        swapped = self._model(self.board22, ((0, 0, 3), (1, 0, 1)))
+        moved = self._model(self.board22, ((0, 0, 1), (2, 0, 2)))
+
+        firstHash = catalogue.canonicalHash(first.getProblem())
+        self.assertEqual(firstHash,
+                         catalogue.canonicalHash(swapped.getProblem()))
+        self.assertNotEqual(firstHash,
+                            catalogue.canonicalHash(moved.getProblem()))
+
+
+
+
+    def testAddAndQuery(self):
+        """
+        Test bulk adding and filtered queries
+        """
+        unique = self._model(self.board22, ((0, 0, 1), (1, 0, 2), (2, 0, 3),
+                                            (0, 1, 3), (0, 2, 2), (3, 3, 1),
+                                            (2, 2, 4)))
+        models = [unique,
+                  self._model(self.board22, ((0, 0, 1),)),
+                  self._model(self.board22, ((0, 0, 4),)),
+                  self._model(self.board23, ())]
+        # The third model is a relabelling of the second
+        self.assertEqual((3, []), self.catalogue.addModels(models))
+        self.assertEqual((0, []), self.catalogue.addModels(models[:1]))
+
+        self.assertEqual(3, self.catalogue.count())
+        self.assertEqual(2, self.catalogue.count(board=self.board22))
+        self.assertEqual(1, self.catalogue.count(unique=True))
+        self.assertEqual(1, self.catalogue.count(minClues=2, maxClues=7))
+
+        results = list(self.catalogue.query(board=self.board22,
+                                            unique=False))
+        self.assertEqual(1, len(results))
+        self.assertEqual(1, results[0].getProblem().getCell(0, 0))
+        self.assertEqual(0, results[0].getProblem().getCell(1, 0))
+
+        results = list(self.catalogue.query(limit=2))
+        self.assertEqual(2, len(results))
+        results = list(self.catalogue.query(unique=True))
+        self.assertEqual(unique.getProblem().getCells(),
+                         results[0].getProblem().getCells())
+
+
+
+
+    def testQueryPlan(self):
+        """
+        Test that filtered queries read the index without sorting
+        """
+        connection = sqlite3.connect(os.path.join(self.tmpdir.name,
+                                                  "puzzles.db"))
+        try:
+            plan = connection.execute(
+                    "EXPLAIN QUERY PLAN SELECT x_size, y_size, cells "
+                    "FROM puzzles WHERE x_size = 3 AND y_size = 3 "
+                    "AND clues >= 24 AND clues <= 26").fetchall()
+        finally:
+            connection.close()
+        details = " ".join(row[-1] for row in plan)
+        self.assertIn("puzzles_board_clues", details)
+        self.assertNotIn("TEMP B-TREE", details)
+
+
+
+
+    def testBadInputs(self):
+        """
+        Test that bad inputs are reported without losing the others
+        """
+        diagonal = game_model.BoardType(2, 2, None, ((0, 5, 10, 15),))
+        models = [self._model(self.board22, ((0, 0, 1),)),
+                  self._model(diagonal, ()),
+                  self._model(self.board23, ())]
+        added, failed = self.catalogue.addModels(models)
+        self.assertEqual(2, added)
+        self.assertEqual([1], [index for index, e in failed])
+        self.assertIsInstance(failed[0][1], ValueError)
+
+        goodPath = os.path.join(self.tmpdir.name, "good.csv")
+        with open(goodPath, 'w') as fd:
+            csv_io.CsvModelWriter().write(fd, self._model(self.board22,
+                                                          ((0, 0, 1),
+                                                           (1, 0, 2))))
+        with open(goodPath, 'rb') as fd:
+            data = gzip.compress(fd.read())
+        bad = (("bad.csv", b"junk\n"),
+               ("version.csv", b"version:,2,0\n"),
+               ("empty.csv", b"version:,1,0\n\n"),
+               ("truncated.csv.gz", data[:len(data) // 2]))
+        badPaths = []
+        for name, content in bad:
+            path = os.path.join(self.tmpdir.name, name)
+            with open(path, 'wb') as fd:
+                fd.write(content)
+            badPaths.append(path)
+        badPaths.append(os.path.join(self.tmpdir.name, "missing.csv"))
+
+        added, failed = self.catalogue.addFiles([goodPath] + badPaths)
+        self.assertEqual(1, added)
+        self.assertEqual(badPaths, [path for path, e in failed])
+        self.assertIsInstance(failed[1][1], csv_io.VersionError)
+        self.assertIsInstance(failed[2][1], SyntaxError)
+        self.assertIsInstance(failed[3][1], EOFError)
+        self.assertEqual(3, self.catalogue.count())
+
+
+
+
+    def testBudget(self):
+        """
+        Test that problems that run out of budget have unknown grades
+        """
+        budgetCatalogue = catalogue.Catalogue(
+                            os.path.join(self.tmpdir.name, "budget.db"),
+                            lambda: solver.SearchBudget(maxNodes=1))
+        try:
+            models = [self._model(self.board23, ()),
+                      self._model(self.board22, ((0, 0, 1), (1, 0, 2),
+                                                 (2, 0, 3), (0, 1, 3),
+                                                 (0, 2, 2), (3, 3, 1),
+                                                 (2, 2, 4)))]
+            self.assertEqual((2, []), budgetCatalogue.addModels(models))
+            self.assertEqual(1, budgetCatalogue.count(unique=True))
+            self.assertEqual(0, budgetCatalogue.count(unique=False))
+            self.assertEqual(1, budgetCatalogue.count(board=self.board23))
+        finally:
+            budgetCatalogue.close()
+
+
+
+
+    def testAddFiles(self):
+        """
+        Test populating the catalogue from CSV files
+        """
+        path = os.path.join(self.tmpdir.name, "problem.csv")
+        with open(path, 'w') as fd:
+            csv_io.CsvModelWriter().write(fd,
+                            self._model(self.board23, ((5, 5, 6),)))
+
+        self.assertEqual((1, []), self.catalogue.addFiles([path]))
+        result = next(self.catalogue.query(board=self.board23))
+        self.assertEqual(2, result.getBoard().getXSize())
+        self.assertEqual(6, result.getProblem().getCell(5, 5))
+
+
+
+
+if __name__ == "__main__":
+    unittest.main()
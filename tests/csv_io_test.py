@@ -7,6 +7,8 @@ These cover the handling of reading and writing CSV files
 import unittest
 import sys
 import io
+import os
+import tempfile
 
 # If this test is being executed standalone, add '..' to the path
 # to start searching for packages from the top level of the app.
@@ -382,6 +384,181 @@ class TestCsvModelReader(unittest.TestCase):
             
             
             
+class TestCsvModelWriter(unittest.TestCase):
+    def setUp(self):
+        self.writer = csv_io.CsvModelWriter()
+        
+        
+        
+        
+    def tearDown(self):
+        self.writer = None
+        
+        
+        
+        
+    def testWriteRead(self):
+        """
+        Test that a written model reads back unchanged
+        """
+        model = data_model.GameModel(game_model.BoardType(2, 3))
+        model.getProblem().setCell(0, 0, 6)
+        model.getProblem().setCell(5, 5, 1)
+        model.getSolution().setCell(1, 0, 2)
+        
+        fobj = io.StringIO()
+        try:
+            self.writer.write(fobj, model)
+            fobj.seek(0)
+            result = csv_io.CsvModelReader().read(fobj)
+        finally:
+            fobj.close()
+            
+        self.assertEqual(2, result.getBoard().getXSize())
+        self.assertEqual(3, result.getBoard().getYSize())
+        for y in range(6):
+            for x in range(6):
+                self.assertEqual(model.getProblem().getCell(x, y),
+                                result.getProblem().getCell(x, y))
+                self.assertEqual(model.getSolution().getCell(x, y),
+                                result.getSolution().getCell(x, y))
+            
+            
+            
+    def testWriteReadVariant(self):
+        """
+        Test that regions and extra units read back unchanged
+        """
+        regions = (0, 0, 1, 1,
+                   0, 2, 2, 1,
+                   0, 2, 3, 1,
+                   2, 3, 3, 3)
+        board = game_model.BoardType(2, 2, regions, ((0, 5, 10, 15),))
+        model = data_model.GameModel(board)
+        model.getProblem().setCell(3, 3, 2)
+        
+        fobj = io.StringIO()
+        try:
+            self.writer.write(fobj, model)
+            fobj.seek(0)
+            text = fobj.read()
+            fobj.seek(0)
+            result = csv_io.CsvModelReader().read(fobj)
+        finally:
+            fobj.close()
+            
+        self.assertIn("regions:\n0,0,1,1\n0,2,2,1\n", text)
+        self.assertIn("units:,1\n0,5,10,15\n", text)
+        self.assertEqual(board, result.getBoard())
+        self.assertEqual(2, result.getProblem().getCell(3, 3))
+        
+        
+        
+        
+    def testReadRegionsAfterProblem(self):
+        """
+        Test that cells read before regions: are kept
+        """
+        fobj = io.StringIO("version:,1,0\n"
+                           "dimensions:,2,2\n"
+                           "problem:\n1,,,\n,,,\n,,,\n,,,2\n"
+                           "regions:\n0,0,1,1\n0,0,1,1\n"
+                           "2,2,3,3\n2,2,3,3\n"
+                           "units:,0\n")
+        result = csv_io.CsvModelReader().read(fobj)
+        self.assertEqual(game_model.BoardType(2, 2, (0, 0, 1, 1) * 2 +
+                                                 (2, 2, 3, 3) * 2),
+                         result.getBoard())
+        self.assertEqual(1, result.getProblem().getCell(0, 0))
+        self.assertEqual(2, result.getProblem().getCell(3, 3))
+        
+        fobj = io.StringIO("version:,1,0\n"
+                           "dimensions:,2,2\n"
+                           "regions:\n0,0,0,0\n1,1,1,1\n"
+                           "2,2,2,2\n3,3,3,4\n")
+        self.assertRaises(SyntaxError, csv_io.CsvModelReader().read, fobj)
+            
+            
+            
+            
+class TestOpenModelFile(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        
+        
+        
+        
+    def tearDown(self):
+        self.tmpdir.cleanup()
+        
+        
+        
+        
+    def testCompressed(self):
+        """
+        Test that compressed files are written and detected on reading
+        """
+        model = data_model.GameModel(game_model.BoardType(2, 2))
+        model.getProblem().setCell(3, 2, 4)
+        
+        for name in ("plain.csv", "model.gz", "model.bz2", "model.xz"):
+            path = os.path.join(self.tmpdir.name, name)
+            with csv_io.openModelFile(path, 'w') as fobj:
+                csv_io.CsvModelWriter().write(fobj, model)
+                
+            # Detection is by content, not by file name
+            renamed = os.path.join(self.tmpdir.name, "renamed")
+            os.replace(path, renamed)
+            with open(renamed, 'rb') as fobj:
+                isCompressed = not fobj.read().startswith(b"version:")
+            self.assertEqual(name != "plain.csv", isCompressed)
+            
+            with csv_io.openModelFile(renamed) as fobj:
+                result = csv_io.CsvModelReader().read(fobj)
+            self.assertEqual(4, result.getProblem().getCell(3, 2))
+            
+            
+            
+            
+    def testReadAhead(self):
+        """
+        Test reading compressed files on a background thread
+        """
+        path = os.path.join(self.tmpdir.name, "lines.gz")
+        lines = [("{0:05d}".format(i) * 4).encode('ascii')
+                 for i in range(5000)]
+        with csv_io.openModelFile(path, 'wb') as fobj:
+            fobj.write(b"\n".join(lines) + b"\n")
+            
+        with csv_io.openModelFile(path, 'rb', readAhead=True) as fobj:
+            self.assertIsInstance(fobj, csv_io.ReadAheadReader)
+            self.assertEqual(lines[0] + b"\n", fobj.readline())
+            self.assertEqual(lines[1:], [line.rstrip(b"\n")
+                                         for line in fobj])
+            self.assertEqual(b"", fobj.readline())
+            
+        with csv_io.openModelFile(path, 'rb', readAhead=True) as fobj:
+            fobj.readline()
+            self.assertEqual(b"\n".join(lines[1:]) + b"\n", fobj.read())
+            
+        # Closing early with a small queue does not wait for the file
+        fobj = csv_io.ReadAheadReader(csv_io.openModelFile(path, 'rb'),
+                                      maxBlocks=1, blockSize=10)
+        fobj.readline()
+        fobj.close()
+        
+        model = data_model.GameModel(game_model.BoardType(2, 2))
+        model.getProblem().setCell(1, 1, 3)
+        path = os.path.join(self.tmpdir.name, "model.csv.xz")
+        with csv_io.openModelFile(path, 'w') as fobj:
+            csv_io.CsvModelWriter().write(fobj, model)
+        with csv_io.openModelFile(path, readAhead=True) as fobj:
+            result = csv_io.CsvModelReader().read(fobj)
+        self.assertEqual(3, result.getProblem().getCell(1, 1))
+        
+        
+        
+        
                     
 if __name__ == "__main__":
     unittest.main()
@@ -6,6 +6,10 @@ These cover the handling of data for games in progress
 
 import unittest
 import sys
+import os
+import tempfile
+import threading
+import time
 
 # If this test is being executed standalone, add '..' to the path
 # to start searching for packages from the top level of the app.
@@ -14,6 +18,7 @@ if __name__ == "__main__":
 
 from rab_sudoku import data_model
 from rab_sudoku import game_model
+from rab_sudoku import csv_io
 
 class TestEntryData(unittest.TestCase):
     """
@@ -116,6 +121,110 @@ class TestEntryData(unittest.TestCase):
                     msg = "Exception for invalid value {0:d} in {1:s}"
                     self.assertTrue(exception_thrown,
                                     msg.format(value, solution_name))       
+
+    def testBulkCells(self):
+        """
+        Test that all cells can be read and written at once
+        """
+        solution = data_model.PlayingData(self.board24)
+        values = [i % 9 for i in range(64)]
+        solution.setCells(bytes(values))
+        
+        self.assertEqual(values, solution.getCells())
+        self.assertEqual(1, solution.getCell(1, 0))
+        self.assertEqual(8, solution.getCell(0, 1))
+        
+        self.assertRaises(ValueError, solution.setCells, [0] * 63)
+        self.assertRaises(ValueError, solution.setCells, [9] * 64)
+        self.assertRaises(ValueError, solution.setCells, [-1] * 64)
+        
+class TestGameModelController(unittest.TestCase):
+    """
+    Test case for rab_sudoku.data_model.GameModelController
+    """
+    
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.paths = []
+        for i in range(1, 5):
+            model = data_model.GameModel(game_model.BoardType(2, 2))
+            model.getProblem().setCell(0, 0, i)
+            path = os.path.join(self.tmpdir.name, "{0:d}.csv".format(i))
+            with open(path, 'w') as fd:
+                csv_io.CsvModelWriter().write(fd, model)
+            self.paths.append(path)
+        
+        self.badPath = os.path.join(self.tmpdir.name, "bad.csv")
+        with open(self.badPath, 'w') as fd:
+            fd.write("junk\n")
+        os.mkdir(os.path.join(self.tmpdir.name, "subdir"))
+        
+    def tearDown(self):
+        self.tmpdir.cleanup()
+        
+    def testLoadGame(self):
+        """
+        Test that loading a game makes it the current game
+        """
+        controller = data_model.GameModelController()
+        model = controller.loadGame(self.paths[1])
+        self.assertEqual(2, model.getProblem().getCell(0, 0))
+        self.assertIs(model, controller.getModel())
+        
+    def testLoadGames(self):
+        """
+        Test loading a directory with one bad file
+        """
+        controller = data_model.GameModelController()
+        results = list(controller.loadGames(self.tmpdir.name, maxWorkers=3))
+        
+        self.assertEqual(5, len(results))
+        loaded = {}
+        for path, model, error in results:
+            if path == self.badPath:
+                self.assertEqual(None, model)
+                self.assertIsInstance(error, SyntaxError)
+            else:
+                self.assertEqual(None, error)
+                loaded[path] = model.getProblem().getCell(0, 0)
+        self.assertEqual({path: i for i, path in enumerate(self.paths, 1)},
+                         loaded)
+        self.assertEqual(None, controller.getModel())
+        
+        # A sequence of paths can be given instead of a directory
+        results = list(controller.loadGames(self.paths[:2]))
+        self.assertEqual(set(self.paths[:2]),
+                         set(path for path, model, error in results))
+        
+        # A single file path is one file, not a sequence of characters
+        results = list(controller.loadGames(self.paths[0]))
+        self.assertEqual(1, len(results))
+        self.assertEqual(self.paths[0], results[0][0])
+        self.assertEqual(None, results[0][2])
+        
+    def testLoadGamesClose(self):
+        """
+        Test that stopping early does not wait for slow files
+        """
+        release = threading.Event()
+        controller = data_model.GameModelController()
+        readGame = controller._readGame
+        
+        def slowReadGame(path):
+            if path == self.paths[0]:
+                release.wait(10)
+            return readGame(path)
+        controller._readGame = slowReadGame
+        
+        try:
+            start = time.monotonic()
+            games = controller.loadGames(self.paths, maxWorkers=4)
+            path, model, error = next(games)
+            self.assertNotEqual(self.paths[0], path)
+            games.close()
+            self.assertTrue(time.monotonic() - start < 5)
+        finally:
+            release.set()
         
 if __name__ == "__main__":
     unittest.main()
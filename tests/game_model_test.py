@@ -32,5 +32,37 @@ class TestBoardType(unittest.TestCase):
 		self.assertEqual(defaultBoardSize, defaultBoard.getBoardXSize())
 		self.assertEqual(defaultBoardSize, defaultBoard.getBoardYSize())
 
+	def testUnits(self):
+		"""Test the units of standard and variant boards"""
+		board = game_model.BoardType(2, 3)
+		units = board.getUnits()
+		self.assertEqual(18, len(units))
+		self.assertEqual((0, 1, 2, 3, 4, 5), units[0])
+		self.assertEqual((0, 6, 12, 18, 24, 30), units[6])
+		# Boxes are 2 wide and 3 high
+		self.assertEqual((0, 1, 6, 7, 12, 13), units[12])
+		self.assertTrue(board.isStandard())
+		self.assertEqual(game_model.BoardType(2, 3), board)
+		
+		regions = (0, 0, 1, 1,
+				   0, 2, 2, 1,
+				   0, 2, 3, 1,
+				   2, 3, 3, 3)
+		diagonal = (0, 5, 10, 15)
+		board = game_model.BoardType(2, 2, regions, (diagonal,))
+		units = board.getUnits()
+		self.assertEqual(13, len(units))
+		self.assertEqual((0, 1, 4, 8), units[8])
+		self.assertEqual(diagonal, units[12])
+		self.assertFalse(board.isStandard())
+		self.assertNotEqual(game_model.BoardType(2, 2), board)
+		
+		# Units must hold every value exactly once
+		self.assertRaises(ValueError, game_model.BoardType, 2, 2, (0,) * 16)
+		self.assertRaises(ValueError, game_model.BoardType, 2, 2, None,
+						  ((0, 1, 2),))
+		self.assertRaises(ValueError, game_model.BoardType, 2, 2, None,
+						  ((0, 1, 2, 16),))
+
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
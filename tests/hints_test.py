@@ -0,0 +1,105 @@
+"""
+Test cases for classes in hints.py
+
+These cover working out and caching hints for games in progress
+"""
+
+import unittest
+import sys
+
+# If this test is being executed standalone, add '..' to the path
+# to start searching for packages from the top level of the app.
+if __name__ == "__main__":
+    sys.path.insert(0, '..')
+
+from rab_sudoku import data_model
+from rab_sudoku import game_model
+from rab_sudoku import hints
+from puzzles import PROBLEM_33, SOLUTION_33, makePlayingData
+
+class TestHintEngine(unittest.TestCase):
+    """
+    Test case for rab_sudoku.hints.HintEngine
+    """
+
+    def setUp(self):
+        self.engine = hints.HintEngine(maxProblems=2)
+        self.board33 = game_model.BoardType(3, 3)
+        self.model = data_model.GameModel(self.board33)
+        self.model.getProblem().setCells(
+            makePlayingData(self.board33, PROBLEM_33).getCells())
+
+
+
+
+    def tearDown(self):
+        self.engine = None
+
+
+
+
+    def testPath(self):
+        """
+        Test that the path solves the problem and is cached
+        """
+        path = self.engine.getPath(self.model.getProblem())
+        self.assertEqual(51, len(path))
+        for x, y, value, rule in path:
+            self.assertEqual(int(SOLUTION_33[y][x]), value)
+            self.assertIn(rule, (hints.NAKED_SINGLE, hints.HIDDEN_SINGLE))
+        self.assertIs(path, self.engine.getPath(self.model.getProblem()))
+
+        # The least recently used path is evicted
+        for given in (1, 2):
+            other = data_model.PlayingData(self.board33)
+            other.setCell(0, 0, given)
+            self.engine.getPath(other)
+        self.assertIsNot(path, self.engine.getPath(self.model.getProblem()))
+
+
+
+
+    def testNextHint(self):
+        """
+        Test following the path and going off it
+        """
+        path = self.engine.getPath(self.model.getProblem())
+        entries = self.model.getSolution()
+
+        self.assertEqual(path[0], self.engine.nextHint(self.model))
+        for x, y, value, rule in path[:10]:
+            entries.setCell(x, y, value)
+        self.assertEqual(path[10], self.engine.nextHint(self.model))
+
+        # A correct entry out of order is still on the path
+        x, y, value, rule = path[-1]
+        entries.setCell(x, y, value)
+        self.assertEqual(path[10], self.engine.nextHint(self.model))
+
+        # A wrong entry gets the step that corrects it
+        x, y, value, rule = path[20]
+        entries.setCell(x, y, value % 9 + 1)
+        self.assertEqual(path[20], self.engine.nextHint(self.model))
+        entries.setCell(x, y, 0)
+        self.assertEqual(path[10], self.engine.nextHint(self.model))
+
+        for x, y, value, rule in path:
+            entries.setCell(x, y, value)
+        self.assertEqual(None, self.engine.nextHint(self.model))
+
+
+
+
+    def testNoLogicalStep(self):
+        """
+        Test that an empty board has no hint
+        """
+        model = data_model.GameModel(self.board33)
+        self.assertEqual([], self.engine.getPath(model.getProblem()))
+        self.assertEqual(None, self.engine.nextHint(model))
+
+
+
+
+if __name__ == "__main__":
+    unittest.main()
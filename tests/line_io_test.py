@@ -0,0 +1,157 @@
+"""
+Test cases for classes in line_io.py
+
+These cover the handling of one line per puzzle files
+"""
+
+import unittest
+import sys
+import io
+
+# If this test is being executed standalone, add '..' to the path
+# to start searching for packages from the top level of the app.
+if __name__ == "__main__":
+    sys.path.insert(0, '..')
+
+from rab_sudoku import data_model
+from rab_sudoku import game_model
+from rab_sudoku import line_io
+
+LINE_33 = (b"53..7....6..195....98....6.8...6...34..8.3..1"
+           b"7...2...6.6....28....419..5....8..79")
+
+class TestLineModelReader(unittest.TestCase):
+    """
+    Test case for rab_sudoku.line_io.LineModelReader
+    """
+
+    def setUp(self):
+        self.board33 = game_model.BoardType(3, 3)
+        self.reader = line_io.LineModelReader(self.board33)
+
+
+
+
+    def tearDown(self):
+        self.reader = None
+
+
+
+
+    def testReadModels(self):
+        """
+        Test reading problems into models
+        """
+        zeros = LINE_33.replace(b'.', b'0')
+        fobj = io.BytesIO(LINE_33 + b"\n\n" + zeros + b"\r\n")
+        models = list(self.reader.readModels(fobj))
+
+        self.assertEqual(2, len(models))
+        for model in models:
+            problem = model.getProblem()
+            self.assertEqual(5, problem.getCell(0, 0))
+            self.assertEqual(0, problem.getCell(2, 0))
+            self.assertEqual(6, problem.getCell(0, 1))
+            self.assertEqual(9, problem.getCell(8, 8))
+            self.assertEqual(0, model.getSolution().getCell(0, 0))
+
+
+
+
+    def testReadInvalid(self):
+        """
+        Test that bad lines generate SyntaxError exceptions
+        """
+        for line in (LINE_33[:-1], LINE_33 + b"1", b"x" + LINE_33[1:]):
+            fobj = io.BytesIO(line)
+            self.assertRaises(SyntaxError, list, self.reader.readModels(fobj))
+            fobj = io.BytesIO(line)
+            self.assertRaises(SyntaxError, self.reader.readPacked, fobj)
+
+
+
+
+    def testReadPacked(self):
+        """
+        Test decoding problems into a packed array
+        """
+        fobj = io.BytesIO(LINE_33 + b"\n" + b"." * 81 + b"\n")
+        packed = self.reader.readPacked(fobj)
+
+        self.assertEqual(162, len(packed))
+        self.assertEqual([5, 3, 0, 0, 7], list(packed[0:5]))
+        self.assertEqual([0] * 81, list(packed[81:]))
+
+
+
+
+    def testAlphabet(self):
+        """
+        Test larger boards and custom alphabets
+        """
+        board44 = game_model.BoardType(4, 4)
+        reader = line_io.LineModelReader(board44)
+        line = b"G" + b"." * 254 + b"1"
+        problem = next(reader.readModels(io.BytesIO(line))).getProblem()
+        self.assertEqual(16, problem.getCell(0, 0))
+        self.assertEqual(1, problem.getCell(15, 15))
+
+        # 0 is a value, not a blank, when it is in the alphabet
+        board22 = game_model.BoardType(2, 2)
+        reader = line_io.LineModelReader(board22, alphabet=b"0123")
+        problem = next(reader.readModels(io.BytesIO(b"0..3" * 4)))
+        self.assertEqual(1, problem.getProblem().getCell(0, 0))
+        self.assertEqual(0, problem.getProblem().getCell(1, 0))
+
+        self.assertRaises(ValueError, line_io.LineModelReader, board44,
+                          b"123456789")
+
+
+
+
+class TestLineModelWriter(unittest.TestCase):
+    """
+    Test case for rab_sudoku.line_io.LineModelWriter
+    """
+
+    def testWriteRead(self):
+        """
+        Test that written problems read back unchanged
+        """
+        board33 = game_model.BoardType(3, 3)
+        reader = line_io.LineModelReader(board33)
+        models = list(reader.readModels(io.BytesIO(LINE_33)))
+        models.append(data_model.GameModel(board33))
+
+        fobj = io.BytesIO()
+        line_io.LineModelWriter(board33).write(fobj, models)
+        self.assertEqual(LINE_33 + b"\n" + b"." * 81 + b"\n",
+                         fobj.getvalue())
+
+        fobj = io.BytesIO()
+        line_io.LineModelWriter(board33, blank=b'0').write(fobj, models[:1])
+        self.assertEqual(LINE_33.replace(b'.', b'0') + b"\n",
+                         fobj.getvalue())
+
+
+
+
+    def testWriteGrids(self):
+        """
+        Test writing grids from a generator
+        """
+        board22 = game_model.BoardType(2, 2)
+        grids = (bytes([i % 5] * 16) for i in range(5))
+
+        fobj = io.BytesIO()
+        count = line_io.LineModelWriter(board22).writeGrids(fobj, grids)
+        self.assertEqual(5, count)
+        self.assertEqual(b"." * 16 + b"\n" + b"1" * 16 + b"\n",
+                         fobj.getvalue()[:34])
+        self.assertEqual(85, len(fobj.getvalue()))
+
+
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,37 @@
+"""
+Puzzles shared by the test cases
+"""
+
+from rab_sudoku import data_model
+
+PROBLEM_33 = ("53..7....",
+              "6..195...",
+              ".98....6.",
+              "8...6...3",
+              "4..8.3..1",
+              "7...2...6",
+              ".6....28.",
+              "...419..5",
+              "....8..79")
+
+SOLUTION_33 = ("534678912",
+               "672195348",
+               "198342567",
+               "859761423",
+               "426853791",
+               "713924856",
+               "961537284",
+               "287419635",
+               "345286179")
+
+def makePlayingData(board, rows):
+    """
+    Create PlayingData from a sequence of strings, one per row,
+    using '.' for an empty cell
+    """
+    data = data_model.PlayingData(board)
+    for y, row in enumerate(rows):
+        for x, char in enumerate(row):
+            if char != '.':
+                data.setCell(x, y, int(char))
+    return data
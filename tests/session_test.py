@@ -0,0 +1,100 @@
+"""
+Test cases for classes in session.py
+
+These cover keeping many game sessions in a SessionStore
+"""
+
+import unittest
+import sys
+
+# If this test is being executed standalone, add '..' to the path
+# to start searching for packages from the top level of the app.
+if __name__ == "__main__":
+    sys.path.insert(0, '..')
+
+from rab_sudoku import data_model
+from rab_sudoku import game_model
+from rab_sudoku import session
+
+class TestSessionStore(unittest.TestCase):
+    """
+    Test case for rab_sudoku.session.SessionStore
+    """
+
+    def setUp(self):
+        self.store = session.SessionStore(maxActive=2)
+        self.board = game_model.BoardType(2, 2)
+
+
+
+
+    def tearDown(self):
+        self.store = None
+
+
+
+
+    def _controller(self, given, entry):
+        """
+        Create a controller with one given and one player entry
+        """
+        model = data_model.GameModel(self.board)
+        model.getProblem().setCell(0, 0, given)
+        model.getSolution().setCell(3, 3, entry)
+        controller = data_model.GameModelController()
+        controller.setModel(model)
+        return controller
+
+
+
+
+    def testEviction(self):
+        """
+        Test that idle sessions are packed and restored unchanged
+        """
+        for i in range(5):
+            self.store.add(i, self._controller(1, i % 4 + 1))
+        self.store.add("empty", data_model.GameModelController())
+
+        self.assertEqual(6, len(self.store))
+        self.assertEqual(2, self.store.getActiveCount())
+        self.assertTrue(0 in self.store)
+
+        for i in range(5):
+            model = self.store.get(i).getModel()
+            self.assertEqual(1, model.getProblem().getCell(0, 0))
+            self.assertEqual(i % 4 + 1, model.getSolution().getCell(3, 3))
+            self.assertEqual(0, model.getSolution().getCell(0, 0))
+            self.assertEqual(self.board, model.getBoard())
+            self.assertEqual(2, self.store.getActiveCount())
+        self.assertEqual(None, self.store.get("empty").getModel())
+
+        # The most recently used session is not packed again
+        active = self.store.get(4)
+        self.store.get(3)
+        self.assertIs(active, self.store.get(4))
+
+
+
+
+    def testRemove(self):
+        """
+        Test removing active and packed sessions
+        """
+        for i in range(4):
+            self.store.add(i, self._controller(i + 1, 1))
+        self.store.remove(0)
+        self.store.remove(3)
+        self.store.remove("missing")
+
+        self.assertEqual(2, len(self.store))
+        self.assertFalse(0 in self.store)
+        self.assertRaises(KeyError, self.store.get, 0)
+        self.assertEqual(2, self.store.get(1).getModel().getProblem()
+                                                        .getCell(0, 0))
+
+
+
+
+if __name__ == "__main__":
+    unittest.main()
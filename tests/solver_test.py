@@ -0,0 +1,308 @@
+"""
+Test cases for classes in solver.py
+
+These cover solving and counting the solutions of problems
+"""
+
+import unittest
+import sys
+import time
+
+# If this test is being executed standalone, add '..' to the path
+# to start searching for packages from the top level of the app.
+if __name__ == "__main__":
+    sys.path.insert(0, '..')
+
+from rab_sudoku import data_model
+from rab_sudoku import game_model
+from rab_sudoku import solver
+from puzzles import PROBLEM_33, SOLUTION_33, makePlayingData
+
+class TestBitBoardSolver(unittest.TestCase):
+    """
+    Test case for rab_sudoku.solver.BitBoardSolver
+    """
+
+    def setUp(self):
+        self.board33 = game_model.BoardType(3, 3)
+        self.board23 = game_model.BoardType(2, 3)
+        self.solver = solver.BitBoardSolver(self.board33)
+
+
+
+
+    def tearDown(self):
+        self.solver = None
+
+
+
+
+    def testSolve(self):
+        """
+        Test that a standard problem is solved
+        """
+        problem = makePlayingData(self.board33, PROBLEM_33)
+        result = self.solver.solve(problem)
+
+        for y, row in enumerate(SOLUTION_33):
+            for x, char in enumerate(row):
+                self.assertEqual(int(char), result.getCell(x, y))
+
+
+
+
+    def testSolveInvalid(self):
+        """
+        Test that a problem with conflicting givens has no solution
+        """
+        problem = makePlayingData(self.board33, PROBLEM_33)
+        problem.setCell(2, 0, 5)
+        self.assertEqual(None, self.solver.solve(problem))
+        self.assertEqual(0, self.solver.countSolutions(problem))
+
+
+
+
+    def testCountSolutions(self):
+        """
+        Test counting of unique and non-unique problems
+        """
+        problem = makePlayingData(self.board33, PROBLEM_33)
+        self.assertEqual(1, self.solver.countSolutions(problem))
+
+        # Removing givens from a unique problem gives more solutions
+        for x in range(9):
+            problem.setCell(x, 0, 0)
+            problem.setCell(x, 1, 0)
+        self.assertEqual(2, self.solver.countSolutions(problem, limit=2))
+        self.assertTrue(self.solver.countSolutions(problem) > 2)
+
+
+
+
+    def testOtherBoardSizes(self):
+        """
+        Test that boards with rectangular boxes are solved
+        """
+        boardSolver = solver.BitBoardSolver(self.board23)
+        problem = data_model.PlayingData(self.board23)
+        result = boardSolver.solve(problem)
+
+        size = self.board23.getBoardXSize()
+        for y in range(size):
+            row = set(result.getCell(x, y) for x in range(size))
+            self.assertEqual(set(range(1, size + 1)), row)
+        for x in range(size):
+            col = set(result.getCell(x, y) for y in range(size))
+            self.assertEqual(set(range(1, size + 1)), col)
+        # 2 wide by 3 high boxes
+        for boxY in range(0, size, 3):
+            for boxX in range(0, size, 2):
+                box = set(result.getCell(boxX + x, boxY + y)
+                          for x in range(2) for y in range(3))
+                self.assertEqual(set(range(1, size + 1)), box)
+
+
+
+
+    def testBudget(self):
+        """
+        Test that a search stops when its budget runs out
+        """
+        problem = data_model.PlayingData(self.board33)
+
+        budget = solver.SearchBudget(maxNodes=10)
+        with self.assertRaises(solver.BudgetExceeded) as context:
+            self.solver.countSolutions(problem, budget=budget)
+        self.assertEqual('nodes', context.exception.reason)
+        self.assertEqual(11, context.exception.stats['nodes'])
+
+        budget = solver.SearchBudget(maxTime=0.0)
+        with self.assertRaises(solver.BudgetExceeded) as context:
+            self.solver.countSolutions(problem, budget=budget)
+        self.assertEqual('time', context.exception.reason)
+
+        budget = solver.SearchBudget(maxStates=3)
+        with self.assertRaises(solver.BudgetExceeded) as context:
+            self.solver.countSolutions(problem, budget=budget)
+        self.assertEqual('states', context.exception.reason)
+
+        budget = solver.SearchBudget()
+        budget.cancel()
+        with self.assertRaises(solver.BudgetExceeded) as context:
+            self.solver.solve(problem, budget)
+        self.assertEqual('cancelled', context.exception.reason)
+
+        # A generous budget does not affect the result
+        problem = makePlayingData(self.board33, PROBLEM_33)
+        budget = solver.SearchBudget(maxNodes=1000, maxTime=60.0)
+        self.assertEqual(1, self.solver.countSolutions(problem, budget=budget))
+        self.assertEqual(1, self.solver.getStats()['solutions'])
+
+
+
+
+    def testVariants(self):
+        """
+        Test that jigsaw regions and extra units constrain solutions
+        """
+        regions = (0, 0, 1, 1,
+                   0, 2, 2, 1,
+                   0, 2, 3, 1,
+                   2, 3, 3, 3)
+        diagonals = ((0, 5, 10, 15), (3, 6, 9, 12))
+        # Solution counts were checked by brute force over Latin squares
+        variants = ((game_model.BoardType(2, 2, regions), 72),
+                    (game_model.BoardType(2, 2, None, diagonals), 48),
+                    (game_model.BoardType(2, 2, regions, diagonals[:1]), 24))
+        for board, count in variants:
+            boardSolver = solver.BitBoardSolver(board)
+            problem = data_model.PlayingData(board)
+            self.assertEqual(count, boardSolver.countSolutions(problem))
+
+            cells = boardSolver.solve(problem).getCells()
+            for unit in board.getUnits():
+                self.assertEqual(set(range(1, 5)),
+                                 set(cells[cell] for cell in unit))
+
+        # A standard problem does not fit a variant solver
+        boardSolver = solver.BitBoardSolver(board)
+        self.assertRaises(ValueError, boardSolver.solve,
+                          data_model.PlayingData(game_model.BoardType(2, 2)))
+
+
+
+
+    def testTranspositionTable(self):
+        """
+        Test that counts are reused between calls and the table is bounded
+        """
+        table = solver.TranspositionTable(maxEntries=1000)
+        tableSolver = solver.BitBoardSolver(self.board33, table)
+        problem = makePlayingData(self.board33, PROBLEM_33)
+        for x in range(9):
+            problem.setCell(x, 0, 0)
+        for x in range(5):
+            problem.setCell(x, 1, 0)
+
+        count = self.solver.countSolutions(problem)
+        self.assertEqual(count, tableSolver.countSolutions(problem))
+        firstNodes = tableSolver.getStats()['nodes']
+        self.assertEqual(0, table.getStats()['hits'])
+
+        # Adding a given from a solution reuses the stored subtrees
+        problem.setCell(0, 0, 5)
+        self.assertEqual(self.solver.countSolutions(problem),
+                         tableSolver.countSolutions(problem))
+        self.assertTrue(table.getStats()['hits'] > 0)
+
+        problem.setCell(0, 0, 0)
+        self.assertEqual(count, tableSolver.countSolutions(problem))
+        self.assertEqual(1, tableSolver.getStats()['nodes'])
+        self.assertTrue(firstNodes > 1)
+
+        # Limited counts are not stored
+        table = solver.TranspositionTable(maxEntries=2)
+        tableSolver = solver.BitBoardSolver(self.board33, table)
+        self.assertEqual(2, tableSolver.countSolutions(problem, limit=2))
+        self.assertEqual(count, tableSolver.countSolutions(problem))
+        stats = table.getStats()
+        self.assertEqual(2, stats['entries'])
+        self.assertTrue(stats['evictions'] > 0)
+        self.assertTrue(0.0 <= stats['hitRate'] <= 1.0)
+
+        # Counts for one board do not hold for another
+        diagonals = ((0, 5, 10, 15), (3, 6, 9, 12))
+        table = solver.TranspositionTable()
+        board22 = game_model.BoardType(2, 2)
+        tableSolver = solver.BitBoardSolver(board22, table)
+        self.assertEqual(288, tableSolver.countSolutions(
+                                  data_model.PlayingData(board22)))
+        self.assertRaises(ValueError, solver.BitBoardSolver,
+                          game_model.BoardType(2, 2, None, diagonals), table)
+        self.assertIsNotNone(solver.BitBoardSolver(
+                                 game_model.BoardType(2, 2), table))
+
+
+
+
+    def testIterSolutions(self):
+        """
+        Test that solutions are generated one at a time
+        """
+        problem = makePlayingData(self.board33, PROBLEM_33)
+        for x in range(9):
+            problem.setCell(x, 0, 0)
+        for x in range(5):
+            problem.setCell(x, 1, 0)
+        count = self.solver.countSolutions(problem)
+
+        solutions = self.solver.iterSolutions(problem)
+        first = next(solutions)
+        self.assertEqual(81, len(first))
+        self.assertEqual(1, self.solver.getStats()['solutions'])
+        rest = list(solutions)
+        self.assertEqual(count, len(rest) + 1)
+        self.assertEqual(count, len(set(rest + [first])))
+
+        for grid in rest[:5]:
+            for unit in self.board33.getUnits():
+                self.assertEqual(set(range(1, 10)),
+                                 set(grid[cell] for cell in unit))
+            for cell, given in enumerate(problem.getCells()):
+                if given != 0:
+                    self.assertEqual(given, grid[cell])
+
+        limited = list(self.solver.iterSolutions(problem, limit=3))
+        self.assertEqual([first] + rest[:2], limited)
+        self.assertEqual([], list(self.solver.iterSolutions(problem, limit=0)))
+
+
+
+
+    def testIterSolutionsIndependent(self):
+        """
+        Test that a suspended enumeration keeps its own start time
+        """
+        problem = data_model.PlayingData(self.board33)
+        budget = solver.SearchBudget(maxTime=0.05)
+        solutions = self.solver.iterSolutions(problem, budget=budget)
+        next(solutions)
+        firstStats = self.solver.getStats()
+
+        time.sleep(0.1)
+        self.assertEqual(1, self.solver.countSolutions(
+                                makePlayingData(self.board33, PROBLEM_33)))
+        self.assertIsNot(firstStats, self.solver.getStats())
+
+        with self.assertRaises(solver.BudgetExceeded) as context:
+            next(solutions)
+        self.assertEqual('time', context.exception.reason)
+        self.assertIs(firstStats, context.exception.stats)
+        self.assertTrue(context.exception.stats['elapsed'] >= 0.1)
+
+
+
+
+    def testStatesMatch(self):
+        """
+        Test that solve and countSolutions report pending states the same
+        way, so a maxStates budget means the same for both
+        """
+        board = game_model.BoardType(4, 4)
+        boardSolver = solver.BitBoardSolver(board)
+        problem = data_model.PlayingData(board)
+
+        boardSolver.solve(problem)
+        solveStats = dict(boardSolver.getStats())
+        self.assertEqual(1, boardSolver.countSolutions(problem, limit=1))
+        countStats = boardSolver.getStats()
+        self.assertEqual(solveStats['nodes'], countStats['nodes'])
+        self.assertEqual(solveStats['states'], countStats['states'])
+        self.assertTrue(solveStats['states'] > 1)
+
+
+
+
+if __name__ == "__main__":
+    unittest.main()